@@ -6,26 +6,17 @@
 #     double broken by space to indicate new people, how many
 #     calories is the person with the most calories carrying?
 #############################################################
+import heapq
+import sys
+from typing import Iterable, Iterator, TextIO
+
 def p1Soln(inFile: str) -> int:
     # We don't need to parse it all at once. We process it slowly
     # as the file is completely structured
-    maxCals = 0
-    curCalTotal = 0
-    with open(inFile, 'r') as inCalList:
-        curLine = inCalList.readline()
-        while curLine:
-            # reset value if newline is read
-            if curLine == "\n":
-                if curCalTotal > maxCals:
-                    maxCals = curCalTotal
-                curCalTotal = 0
-            # otherwise just update value
-            else:
-                curCalTotal += int(curLine[:-1])
+    with openCalorieStream(inFile) as inCalList:
+        calStats = CalorieStats(1).consume(streamGroupSums(inCalList))
 
-            curLine = inCalList.readline()
-
-    return maxCals
+    return calStats.maxCals
 
 #############################################################
 #   Soln for P2 of Day 1 for AoC
@@ -44,40 +35,79 @@ def p1Soln(inFile: str) -> int:
 #     we pop the value and add our larger one.
 #############################################################
 def p2Soln(inFile: str, N: int) -> list[int]:
-    import heapq
+    with openCalorieStream(inFile) as inCalList:
+        calStats = CalorieStats(N).consume(streamGroupSums(inCalList))
+
+    return calStats.topCals
 
-    maxCals = list()
+#############################################################
+#   Single pass for both parts
+#
+# Observation:
+#     Both parts only need per-person totals, so a single pass
+#     can yield each total as soon as its group ends and feed one
+#     consumer that keeps the max, a bounded top-N heap and the
+#     running total. Nothing but the current line and the N-sized
+#     heap is held in memory, regardless of the input size.
+#############################################################
+def streamGroupSums(inLines: Iterable[str]) -> Iterator[int]:
     curCalTotal = 0
-    with open(inFile, 'r') as inCalList:
-        curLine = inCalList.readline()
-        while curLine:
-            if curLine == "\n":
-                # update heap if smaller than N automatically
-                if len(maxCals) < N:
-                    heapq.heappush(maxCals, curCalTotal)
-                # or perform comparison once we reach desired size
-                elif curCalTotal > maxCals[0]:
-                    heapq.heapreplace(maxCals, curCalTotal)
-                    
-                curCalTotal = 0
-            # otherwise just update value
-            else:
-                curCalTotal += int(curLine[:-1])
+    inGroup = False
+    for curLine in inLines:
+        curLine = curLine.strip()
+        # a blank line closes the current person
+        if not curLine:
+            if inGroup:
+                yield curCalTotal
+            curCalTotal, inGroup = 0, False
+        # otherwise just update value
+        else:
+            curCalTotal += int(curLine)
+            inGroup = True
 
-            curLine = inCalList.readline()
+    # the last person is not always followed by a blank line
+    if inGroup:
+        yield curCalTotal
 
-    return maxCals
+class CalorieStats:
+    def __init__(self, N: int):
+        self.N = N
+        self.topCals = list()
+        self.maxCals = 0
+        self.totalCals = 0
+        self.numGroups = 0
 
-if __name__ == "__main__":
-    # Name of the file for part 1
-    p1File = "./2022/Day01/input"
+    def update(self, groupSum: int) -> None:
+        self.maxCals = max(self.maxCals, groupSum)
+        self.totalCals += groupSum
+        self.numGroups += 1
+
+        # update heap if smaller than N automatically
+        if len(self.topCals) < self.N:
+            heapq.heappush(self.topCals, groupSum)
+        # or perform comparison once we reach desired size
+        elif groupSum > self.topCals[0]:
+            heapq.heapreplace(self.topCals, groupSum)
 
-    # Executes the first part of the problem
-    sol1 = p1Soln(p1File)
-    print("Solution for part 1 is: {}".format(sol1))
+    def consume(self, groupSums: Iterable[int]) -> "CalorieStats":
+        for groupSum in groupSums:
+            self.update(groupSum)
+        return self
+
+# "-" reads from stdin so huge inputs can be piped in directly
+def openCalorieStream(inFile: str) -> TextIO:
+    if inFile == "-":
+        return open(sys.stdin.fileno(), 'r', closefd = False)
+    return open(inFile, 'r')
+
+if __name__ == "__main__":
+    # Name of the file for both parts (or "-" for stdin)
+    p1File = sys.argv[1] if len(sys.argv) > 1 else "./2022/Day01/input"
 
-    # Executes the second part now. Sum of these values
-    # is the answer
+    # Executes both parts in a single pass. Sum of the top
+    # three values is the answer to the second part
     numToKeep = 3
-    sol2 = p2Soln(p1File, 3)
-    print("Solution for part 2 is {}".format(sum(sol2)))
\ No newline at end of file
+    with openCalorieStream(p1File) as inCalList:
+        calStats = CalorieStats(numToKeep).consume(streamGroupSums(inCalList))
+    print("Solution for part 1 is: {}".format(calStats.maxCals))
+    print("Solution for part 2 is {}".format(sum(calStats.topCals)))
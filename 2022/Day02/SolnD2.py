@@ -34,15 +34,7 @@ class RPSFixture():
 
 
 def p1Soln(inFile: str, rpsFixture: RPSFixture) -> int:
-    totScores = 0
-    with open(inFile, 'r') as roundGuide:
-        curRound = roundGuide.readline().strip().split()
-        while curRound:
-            # evaluate round and add to total score
-            totScores += rpsFixture.processMatchup(curRound[0], curRound[1])
-            curRound = roundGuide.readline().strip().split()
-
-    return totScores
+    return scoreMatchupCounts(countMatchups(inFile), compileScoreTable(rpsFixture))
 
 ###############################################################
 #   Soln for P2 of Day 2 for AoC
@@ -81,15 +73,41 @@ class CondRPSFixture():
             return self.shapeScores[self.loseDict[inA]] + self.lossVal
 
 def p2Soln(inFile: str, rpsFixture: CondRPSFixture) -> int:
-    totScores = 0
-    with open(inFile, 'r') as roundGuide:
-        curRound = roundGuide.readline().strip().split()
-        while curRound:
-            # evaluate round and add to total score
-            totScores += rpsFixture.processMatchup(curRound[0], curRound[1])
-            curRound = roundGuide.readline().strip().split()
+    return scoreMatchupCounts(countMatchups(inFile), compileScoreTable(rpsFixture))
+
+###############################################################
+#   Bulk scoring for P1 and P2
+#
+# Observation:
+#     There are only 9 possible rounds, so each fixture can be
+#     compiled into a 9 entry score table up front. The guide then
+#     only needs to be reduced to how often each round shows up,
+#     which bytes.count does over large chunks of the raw file
+#     without ever splitting a line in Python. Both parts are then
+#     answered from the same counts.
+###############################################################
+OPP_MOVES = ("A", "B", "C")
+OWN_MOVES = ("X", "Y", "Z")
+
+def compileScoreTable(rpsFixture: RPSFixture | CondRPSFixture) -> dict[tuple[str, str], int]:
+    return {(inA, inB):rpsFixture.processMatchup(inA, inB) for inA in OPP_MOVES for inB in OWN_MOVES}
 
-    return totScores
+def countMatchups(inFile: str, chunkSize: int = 1 << 24) -> dict[tuple[str, str], int]:
+    roundKeys = {(inA, inB):"{} {}".format(inA, inB).encode() for inA in OPP_MOVES for inB in OWN_MOVES}
+    roundCounts = dict.fromkeys(roundKeys, 0)
+    with open(inFile, 'rb') as roundGuide:
+        curChunk = roundGuide.read(chunkSize)
+        while curChunk:
+            # finish the last line so no round is split across chunks
+            curChunk += roundGuide.readline()
+            for roundKey, roundBytes in roundKeys.items():
+                roundCounts[roundKey] += curChunk.count(roundBytes)
+            curChunk = roundGuide.read(chunkSize)
+
+    return roundCounts
+
+def scoreMatchupCounts(roundCounts: dict[tuple[str, str], int], scoreTable: dict[tuple[str, str], int]) -> int:
+    return sum([numRounds * scoreTable[roundKey] for roundKey, numRounds in roundCounts.items()])
 
 if __name__ == "__main__":
     # Sets up the hard values for the first problem...
@@ -99,14 +117,13 @@ if __name__ == "__main__":
     (winVal, lossVal, tieVal) = (6, 0, 3)
     prefixedRPSFixture = RPSFixture(winVal, lossVal, tieVal, shapeScores, decryptDict)
 
-    # Evaluate P1
-    soln1 = p1Soln(inFile, prefixedRPSFixture)
-    print("The total score given by the method for part 1 is {}".format(soln1))
-
     # Sets up the fixture for the second half now
     condDict = {"X":"L", "Y":"D", "Z":"W"}
     condRPSFixture = CondRPSFixture(winVal, lossVal, tieVal, shapeScores, condDict)
 
-    # Evaluate P2
-    soln2 = p2Soln(inFile, condRPSFixture)
-    print("The total score given by the method for part 2 is {}".format(soln2))
\ No newline at end of file
+    # Both parts are scored from a single count over the guide
+    roundCounts = countMatchups(inFile)
+    soln1 = scoreMatchupCounts(roundCounts, compileScoreTable(prefixedRPSFixture))
+    print("The total score given by the method for part 1 is {}".format(soln1))
+    soln2 = scoreMatchupCounts(roundCounts, compileScoreTable(condRPSFixture))
+    print("The total score given by the method for part 2 is {}".format(soln2))
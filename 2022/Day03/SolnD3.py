@@ -71,14 +71,53 @@ def p2Soln(inFile: str) -> list[str]:
 
     return dups
 
+###############################################################
+#   Bitmask priorities for P1 and P2
+#
+# Observation:
+#     There are only 52 item types, so every rucksack (half) fits
+#     into a single integer mask where bit (priority - 1) marks an
+#     item. The shared item is then just the AND of the masks and
+#     its priority is the bit_length of the result, which needs no
+#     dicts or sets per line at all.
+###############################################################
+import operator
+
+PRIORITY_BITS = [0] * 256
+for priorChar in "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ":
+    PRIORITY_BITS[ord(priorChar)] = 1 << (evalPriority(priorChar) - 1)
+
+def itemMask(items: bytes) -> int:
+    return reduce(operator.or_, map(PRIORITY_BITS.__getitem__, items), 0)
+
+# Sum of priorities of the item shared by both halves of every line
+def p1SolnBits(inFile: str) -> int:
+    priorSum = 0
+    with open(inFile, 'rb') as strStream:
+        for curLine in strStream:
+            curLine = curLine.rstrip()
+            halfLen = len(curLine) // 2
+            priorSum += (itemMask(curLine[:halfLen]) & itemMask(curLine[halfLen:])).bit_length()
+
+    return priorSum
+
+# Sum of priorities of the item shared by every group of three lines
+def p2SolnBits(inFile: str) -> int:
+    priorSum = 0
+    with open(inFile, 'rb') as strStream:
+        for line1, line2, line3 in zip(strStream, strStream, strStream):
+            priorSum += (itemMask(line1.rstrip()) & itemMask(line2.rstrip()) & itemMask(line3.rstrip())).bit_length()
+
+    return priorSum
+
 if __name__ == "__main__":
     # Set up space for P1
     inFile = "./2022/Day03/input"
 
     # Evaluate P1
-    soln1 = p1Soln(inFile)
-    print("Sum of priorities of values for part 1 is {}".format(reduce(lambda x, y:x + evalPriority(y), soln1, 0)))
+    soln1 = p1SolnBits(inFile)
+    print("Sum of priorities of values for part 1 is {}".format(soln1))
 
     # Evaluate P2
-    soln2 = p2Soln(inFile)
-    print("Sum of priorities of values for part 2 is {}".format(reduce(lambda x, y:x + evalPriority(y), soln2, 0)))
\ No newline at end of file
+    soln2 = p2SolnBits(inFile)
+    print("Sum of priorities of values for part 2 is {}".format(soln2))
@@ -70,14 +70,42 @@ def p2Soln(inFile: str) -> int:
         
     return numOverlaps
 
+###############################################################
+#   Vectorized counting for P1 and P2
+#
+# Observation:
+#     Every line is just four integers, so the whole file can be
+#     parsed into one (N, 4) array in a single call by turning the
+#     separators into spaces. Containment and overlap are then
+#     elementwise comparisons over the columns, and both parts are
+#     answered from the same parse.
+###############################################################
+import numpy as np
+
+SEPARATOR_TABLE = bytes.maketrans(b"-,\r\n", b"    ")
+
+def loadAssignments(inFile: str) -> np.ndarray:
+    with open(inFile, 'rb') as pairList:
+        rawPairs = pairList.read().translate(SEPARATOR_TABLE)
+    return np.fromstring(rawPairs.decode(), dtype = np.int64, sep = ' ').reshape(-1, 4)
+
+def countContained(pairArr: np.ndarray) -> int:
+    x1, x2, y1, y2 = pairArr.T
+    return int(np.count_nonzero(((x1 <= y1) & (y2 <= x2)) | ((y1 <= x1) & (x2 <= y2))))
+
+def countOverlaps(pairArr: np.ndarray) -> int:
+    x1, x2, y1, y2 = pairArr.T
+    return int(np.count_nonzero((x1 <= y2) & (y1 <= x2)))
+
 if __name__ == "__main__":
-    # Set up env for p1
+    # Set up env for both parts
     inFile = "./2022/Day04/input"
+    pairArr = loadAssignments(inFile)
 
     # Evaluate p1
-    sol1 = p1Soln(inFile)
+    sol1 = countContained(pairArr)
     print("Solution to p1 is {}".format(sol1))
 
     # Evaluate p2
-    sol2 = p2Soln(inFile)
-    print("Solution to p2 is {}".format(sol2))
\ No newline at end of file
+    sol2 = countOverlaps(pairArr)
+    print("Solution to p2 is {}".format(sol2))
@@ -7,70 +7,67 @@
 #     once the actions are all carried out.
 ###############################################################
 # Some helper functions for parsing
+from array import array
+from typing import Optional
+
 READ_IN_CHARS = 4        # Need this for the silly parsing at the start
-def parseInitialState(inFile: str) -> list[list[str]]:
-    # values used later...
-    numStacks = None
 
-    # Determine stack count using a certain line
+# Parses the drawing and the moves in a single pass. Moves are
+# kept flat as (count, from, to) triples in an int array.
+def parseCrateFile(inFile: str) -> tuple[list[list[str]], array]:
+    drawingRows = list()
+    moveVals = array('i')
+
     with open(inFile, 'r') as initFile:
+        # the drawing ends at the line numbering the stacks
         curLine = initFile.readline()
-        while not curLine[0] == " ":
+        # rows with an empty first stack start with a space too, so look at the content
+        while not curLine.strip()[:1].isdigit():
+            drawingRows.append([curLine[i:i+READ_IN_CHARS].strip().strip("[]") for i in range(0, len(curLine), READ_IN_CHARS)])
             curLine = initFile.readline()
-
-        # Determine the number of stacks from this line
         numStacks = int(curLine.split()[-1])
+        initFile.readline()
 
-    # Now form and populate every stack
-    initState = [list() for _ in range(numStacks)]
-    with open(inFile, 'r') as initFile:
-        curLine = initFile.readline()
-        while not curLine[0] == " ":
-            # parse current line for tokens to add to stacks
-            tokens = [curLine[i:i+READ_IN_CHARS].strip() for i in range(0, len(curLine), READ_IN_CHARS)]
-            
-            # for any given token found, add these elements to the stacks as if it were a queue
-            for stackInd, token in enumerate(tokens):
-                if token:
-                    initState[stackInd].append(token)
-
-            # Then move onto the next line
-            curLine = initFile.readline()
+        # grab all of the moves
+        for curLine in initFile:
+            if curLine.strip():
+                moveVals.extend(int(val) for val in curLine.split()[1::2])
 
-    # This stack is flipped as we started from the top, so we go ahead and reverse it here
-    [stack.reverse() for stack in initState]
+    # Now populate every stack from the bottom row upwards
+    initState = [list() for _ in range(numStacks)]
+    for tokens in reversed(drawingRows):
+        for stackInd, token in enumerate(tokens):
+            if token:
+                initState[stackInd].append(token)
 
     # return with 0-index modifier list to keep things legible
-    return [[]] + initState
+    return [[]] + initState, moveVals
 
-# Performs the set of desired operations and returns the top elements
-# of each stack
-def p1Soln(inFile: str) -> str:
-    # process initial state
-    curStacks = parseInitialState(inFile)
+# Replays every move on a copy of the stacks. Each move takes the
+# top crates as one slice, reversing it for the CrateMover 9000 that
+# lifts them one at a time.
+def replayMoves(initStacks: list[list[str]], moveVals: array, * , keepsOrder: bool) -> list[list[str]]:
+    curStacks = [list(curStack) for curStack in initStacks]
+    for moveInd in range(0, len(moveVals), 3):
+        numToMove, fromStack, toStack = moveVals[moveInd:moveInd+3]
+        srcStack = curStacks[fromStack]
+        if numToMove > len(srcStack):
+            raise IndexError("Cannot move {} crates from stack {} holding {}".format(numToMove, fromStack, len(srcStack)))
+        movedCrates = srcStack[len(srcStack)-numToMove:]
+        del srcStack[len(srcStack)-numToMove:]
+        curStacks[toStack].extend(movedCrates if keepsOrder else reversed(movedCrates))
 
-    # process updates
-    with open(inFile, 'r') as dirFile:
-        # get rid of initial state garbage
-        while dirFile.readline().strip() != "":
-            continue
+    return curStacks
 
-        # grab and perform updates
-        curLine = dirFile.readline().rstrip()
-        while curLine:
-            # parse line
-            numToMove, fromStack, toStack = (int(val) for val in curLine.split()[1::2])
+# Then simply read off the top of the stacks
+def readStackTops(curStacks: list[list[str]]) -> str:
+    return "".join([curStack[-1] for curStack in curStacks[1:] if curStack])
 
-            # move values
-            for _ in range(numToMove):
-                curStacks[toStack].append(curStacks[fromStack].pop())
-
-            # grab next line
-            curLine = dirFile.readline().rstrip()
-
-    # Then simply read off the top of the stacks
-    stackTops = [curStack[-1].strip("[]") for curStack in curStacks[1:]]
-    return "".join(stackTops)
+# Performs the set of desired operations and returns the top elements
+# of each stack
+def p1Soln(inFile: str) -> str:
+    curStacks, moveVals = parseCrateFile(inFile)
+    return readStackTops(replayMoves(curStacks, moveVals, keepsOrder = False))
 
 ###############################################################
 #   Soln for P2 of Day 5 for AoC
@@ -80,47 +77,260 @@ def p1Soln(inFile: str) -> str:
 #     situation, determine the boxes at the top of the stacks
 #     once the actions are all carried out.
 #     In this scenario, we assume more than one box can be picked
-#     up at a given time. (This can be simulated with a dummy stack
-#     to move things into and out of without much modification.)
+#     up at a given time. (This is the same slice as above, just
+#     without reversing it.)
 ###############################################################
 def p2Soln(inFile: str) -> str:
-    # process initial state
-    curStacks = parseInitialState(inFile)
-    tempStack = list()
-
-    # process updates
-    with open(inFile, 'r') as dirFile:
-        # get rid of initial state garbage
-        while dirFile.readline().strip() != "":
-            continue
-
-        # grab and perform updates
-        curLine = dirFile.readline().rstrip()
-        while curLine:
-            # parse line
-            numToMove, fromStack, toStack = (int(val) for val in curLine.split()[1::2])
-
-            # move values to temp stack then to proper stack (simulate N box removal)
-            for _ in range(numToMove):
-                tempStack.append(curStacks[fromStack].pop())
-            for _ in range(numToMove):
-                curStacks[toStack].append(tempStack.pop())
-
-            # grab next line
-            curLine = dirFile.readline().rstrip()
-
-    # Then simply read off the top of the stacks
-    stackTops = [curStack[-1].strip("[]") for curStack in curStacks[1:]]
-    return "".join(stackTops)
+    curStacks, moveVals = parseCrateFile(inFile)
+    return readStackTops(replayMoves(curStacks, moveVals, keepsOrder = True))
+
+###############################################################
+#   Rope stacks for very deep stacks
+#
+# Observation:
+#     Even a slice move copies every moved crate, so with millions
+#     of crates and large moves the cost still grows with k. A stack
+#     can instead be an implicit treap (a randomized balanced tree
+#     keyed by position), where taking the top k crates is a split
+#     and placing them is a merge, both O(log n). The reversed order
+#     of the CrateMover 9000 is a lazy flag that is only pushed down
+#     into the children when a later split or merge walks through it.
+###############################################################
+import os
+import random
+import sys
+import tempfile
+import time
+
+class RopeStack:
+    class _Node:
+        __slots__ = ("crate", "prio", "size", "left", "right", "isReversed")
+
+        def __init__(self, crate: str):
+            self.crate = crate
+            self.prio = 0.0
+            self.size = 1
+            self.left = None
+            self.right = None
+            self.isReversed = False
+
+    def __init__(self, crates: list[str] = (), * , root: Optional["RopeStack._Node"] = None):
+        self.root = root if root is not None else self._build(list(crates))
+
+    def __len__(self) -> int:
+        return self._size(self.root)
+
+    def __getitem__(self, index: int) -> str:
+        if not -len(self) <= index < len(self):
+            raise IndexError("RopeStack index out of range")
+        index %= len(self)
+
+        curNode = self.root
+        while True:
+            self._push(curNode)
+            leftSize = self._size(curNode.left)
+            if index == leftSize:
+                return curNode.crate
+            elif index < leftSize:
+                curNode = curNode.left
+            else:
+                index -= leftSize + 1
+                curNode = curNode.right
+
+    # Removes the top numCrates crates and returns them as their own stack
+    def popTop(self, numCrates: int) -> "RopeStack":
+        if not 0 <= numCrates <= len(self):
+            raise IndexError("Cannot pop {} crates from a RopeStack holding {}".format(numCrates, len(self)))
+        self.root, topNode = self._split(self.root, len(self) - numCrates)
+        return RopeStack(root = topNode)
+
+    # Places another stack on top, optionally flipping it as a single lazy flag
+    def pushTop(self, otherStack: "RopeStack", * , reverse: bool = False) -> None:
+        if reverse and otherStack.root is not None:
+            otherStack.root.isReversed ^= True
+        self.root = self._merge(self.root, otherStack.root)
+        otherStack.root = None
+
+    def toList(self) -> list[str]:
+        crates = list()
+        toVisit = list()
+        curNode = self.root
+        while toVisit or curNode is not None:
+            if curNode is not None:
+                self._push(curNode)
+                toVisit.append(curNode)
+                curNode = curNode.left
+            else:
+                curNode = toVisit.pop()
+                crates.append(curNode.crate)
+                curNode = curNode.right
+        return crates
+
+    ############### TREAP HELPERS ####################
+    @staticmethod
+    def _size(node: Optional["RopeStack._Node"]) -> int:
+        return node.size if node is not None else 0
+
+    @staticmethod
+    def _push(node: "RopeStack._Node") -> None:
+        if node.isReversed:
+            node.left, node.right = node.right, node.left
+            for child in (node.left, node.right):
+                if child is not None:
+                    child.isReversed ^= True
+            node.isReversed = False
+
+    @classmethod
+    def _update(cls, node: "RopeStack._Node") -> None:
+        node.size = 1 + cls._size(node.left) + cls._size(node.right)
+
+    # Splits into the first numFirst crates (bottom) and the rest (top)
+    @classmethod
+    def _split(cls, node: Optional["RopeStack._Node"], numFirst: int) -> tuple[Optional["RopeStack._Node"], Optional["RopeStack._Node"]]:
+        if node is None:
+            return None, None
+        cls._push(node)
+        if cls._size(node.left) >= numFirst:
+            firstPart, node.left = cls._split(node.left, numFirst)
+            cls._update(node)
+            return firstPart, node
+        else:
+            node.right, restPart = cls._split(node.right, numFirst - cls._size(node.left) - 1)
+            cls._update(node)
+            return node, restPart
+
+    @classmethod
+    def _merge(cls, lNode: Optional["RopeStack._Node"], rNode: Optional["RopeStack._Node"]) -> Optional["RopeStack._Node"]:
+        if lNode is None or rNode is None:
+            return lNode if rNode is None else rNode
+        if lNode.prio > rNode.prio:
+            cls._push(lNode)
+            lNode.right = cls._merge(lNode.right, rNode)
+            cls._update(lNode)
+            return lNode
+        else:
+            cls._push(rNode)
+            rNode.left = cls._merge(lNode, rNode.left)
+            cls._update(rNode)
+            return rNode
+
+    # Builds a balanced tree and hands out sorted random priorities level by level,
+    # so the heap order holds while priorities stay random for later merges
+    @classmethod
+    def _build(cls, crates: list[str]) -> Optional["RopeStack._Node"]:
+        if not crates:
+            return None
+
+        nodes = [cls._Node(crate) for crate in crates]
+        def linkRange(lo: int, hi: int) -> Optional["RopeStack._Node"]:
+            if lo >= hi:
+                return None
+            mid = (lo + hi) // 2
+            nodes[mid].left = linkRange(lo, mid)
+            nodes[mid].right = linkRange(mid + 1, hi)
+            cls._update(nodes[mid])
+            return nodes[mid]
+        root = linkRange(0, len(nodes))
+
+        prios = sorted([random.random() for _ in nodes], reverse = True)
+        levelNodes = [root]
+        prioInd = 0
+        while levelNodes:
+            nextLevel = list()
+            for node in levelNodes:
+                node.prio = prios[prioInd]
+                prioInd += 1
+                nextLevel.extend([child for child in (node.left, node.right) if child is not None])
+            levelNodes = nextLevel
+        return root
+
+def replayMovesRope(initStacks: list[list[str]], moveVals: array, * , keepsOrder: bool) -> list[RopeStack]:
+    curStacks = [RopeStack(curStack) for curStack in initStacks]
+    for moveInd in range(0, len(moveVals), 3):
+        numToMove, fromStack, toStack = moveVals[moveInd:moveInd+3]
+        curStacks[toStack].pushTop(curStacks[fromStack].popTop(numToMove), reverse = not keepsOrder)
+
+    return curStacks
+
+###############################################################
+#   Benchmark
+#
+# Replays random large moves over generated deep stacks with the
+# list and rope backends. Run the file with "--bench", or with
+# "--check" to replay the puzzle example on both backends.
+###############################################################
+def benchmarkStacks(numStacks: int = 9, numCrates: int = 2000000, numMoves: int = 5000) -> None:
+    crateNames = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    initStacks = [[]] + [[random.choice(crateNames) for _ in range(numCrates // numStacks)] for _ in range(numStacks)]
+
+    # simulate stack sizes so every move is valid and tends to be large
+    stackSizes = [len(curStack) for curStack in initStacks]
+    moveVals = array('i')
+    for _ in range(numMoves):
+        fromStack = max(range(1, numStacks + 1), key = lambda stackInd: stackSizes[stackInd])
+        toStack = random.choice([stackInd for stackInd in range(1, numStacks + 1) if stackInd != fromStack])
+        numToMove = random.randint(1, stackSizes[fromStack])
+        stackSizes[fromStack] -= numToMove
+        stackSizes[toStack] += numToMove
+        moveVals.extend((numToMove, fromStack, toStack))
+
+    for keepsOrder in (False, True):
+        listStart = time.perf_counter()
+        listTops = readStackTops(replayMoves(initStacks, moveVals, keepsOrder = keepsOrder))
+        listTime = time.perf_counter() - listStart
+
+        ropeStart = time.perf_counter()
+        ropeTops = readStackTops(replayMovesRope(initStacks, moveVals, keepsOrder = keepsOrder))
+        ropeTime = time.perf_counter() - ropeStart
+
+        if listTops != ropeTops:
+            raise RuntimeError("Stack tops differ between backends ({} vs {})".format(listTops, ropeTops))
+        print("CrateMover {}: list {:.2f}s, rope {:.2f}s (incl. build)".format(9001 if keepsOrder else 9000, listTime, ropeTime))
+
+EXAMPLE_DRAWING = """    [D]    
+[N] [C]    
+[Z] [M] [P]
+ 1   2   3 
+
+move 1 from 2 to 1
+move 3 from 1 to 3
+move 2 from 2 to 1
+move 1 from 1 to 2
+"""
+
+def checkExample() -> None:
+    with tempfile.NamedTemporaryFile('w', suffix = ".txt", delete = False) as outFile:
+        outFile.write(EXAMPLE_DRAWING)
+        tempPath = outFile.name
+
+    try:
+        initStacks, moveVals = parseCrateFile(tempPath)
+    finally:
+        os.remove(tempPath)
+
+    for keepsOrder, expectedTops in ((False, "CMZ"), (True, "MCD")):
+        listTops = readStackTops(replayMoves(initStacks, moveVals, keepsOrder = keepsOrder))
+        ropeTops = readStackTops(replayMovesRope(initStacks, moveVals, keepsOrder = keepsOrder))
+        if not (listTops == ropeTops == expectedTops):
+            raise RuntimeError("Example gave {} / {} instead of {}".format(listTops, ropeTops, expectedTops))
+    print("Example matches CMZ / MCD on both backends")
 
 if __name__ == "__main__":
-    # Set up env for first problem
+    if "--bench" in sys.argv:
+        benchmarkStacks()
+        sys.exit(0)
+    if "--check" in sys.argv:
+        checkExample()
+        sys.exit(0)
+
+    # Set up env for both problems from a single parse
     inFile = "./2022/Day05/input"
+    initStacks, moveVals = parseCrateFile(inFile)
 
     # Then evaluate the problem
-    sol1 = p1Soln(inFile)
+    sol1 = readStackTops(replayMoves(initStacks, moveVals, keepsOrder = False))
     print("Solution for p1 is {}".format(sol1))
 
     # Evaluate second half now
-    sol2 = p2Soln(inFile)
-    print("Solution for p2 is {}".format(sol2))
\ No newline at end of file
+    sol2 = readStackTops(replayMoves(initStacks, moveVals, keepsOrder = True))
+    print("Solution for p2 is {}".format(sol2))
@@ -7,24 +7,42 @@
 #     been parsed.
 ###############################################################
 # We use a sliding window to determine whether or not the predicate
-# holds for the window. This should take O(N) either way due to the
-# fixed string size
+# holds for the window. Instead of rebuilding a set for every window,
+# the last index each byte was seen at is kept in a 256-entry table.
+# A repeated byte inside the window pushes the window start past its
+# previous occurrence, so the window always holds distinct bytes and
+# the whole stream is handled in a single O(N) pass for any length.
+# The datastream is a single line, so scanning stops at its terminator.
+from typing import Iterator
+
+LINE_ENDS = frozenset(b"\r\n")
+
+def findMarkers(inFile: str, substrLen: int, chunkSize: int = 1 << 20) -> Iterator[int]:
+    lastSeen = [-1] * 256
+    windowStart = 0
+    chunkOffset = 0
+
+    with open(inFile, 'rb') as queriedStrings:
+        curChunk = queriedStrings.read(chunkSize)
+        while curChunk:
+            for chunkInd, curByte in enumerate(curChunk):
+                if curByte in LINE_ENDS:
+                    return
+                curInd = chunkOffset + chunkInd
+                if lastSeen[curByte] >= windowStart:
+                    windowStart = lastSeen[curByte] + 1
+                lastSeen[curByte] = curInd
+
+                # report the index right after every distinct window
+                if curInd - windowStart + 1 >= substrLen:
+                    yield curInd + 1
+
+            chunkOffset += len(curChunk)
+            curChunk = queriedStrings.read(chunkSize)
+
 def p1Soln(inFile: str, substrLen: int) -> int:
-    with open(inFile, 'r') as queriedStrings:
-        curInd = substrLen
-        query = queriedStrings.read(substrLen)
-
-        while(True):
-            # is cur substring's chars unique?
-            if len(set(query)) == len(query):
-                return curInd
-
-            # otherwise keep looking
-            curInd += 1
-            query = query[1:] + queriedStrings.read(1)
-    
-    # This shouldn't be reached ever...
-    return -1
+    # This shouldn't return -1 ever...
+    return next(findMarkers(inFile, substrLen), -1)
 
 if __name__ == "__main__":
     # Setup env for p1
@@ -38,4 +56,4 @@ if __name__ == "__main__":
     # Eval p2 (in this case the solution is the same but with diff args)
     p2DesiredSubstrLen = 14
     soln2 = p1Soln(inFile, p2DesiredSubstrLen)
-    print("Solution for p2 is {}".format(soln2))
\ No newline at end of file
+    print("Solution for p2 is {}".format(soln2))
@@ -6,97 +6,128 @@
 #     total sum of the directory sizes for directories which have
 #     AT MOST 100 000 bytes within them.
 ###############################################################
-# Make a simple tree that records all of the data sies available.
-# A node should contain the path of the current file and the data size
-# will be given for all leaf nodes (as these would be the files).
-# Directory sizes will be infered by moving through this tree after ingesting
-# the directory data.
-import typing
-class Node:
-    def __init__(self, filePath: str, dataSize: int = -1, children: typing.Optional[list] = None, isDir: bool = False):
-        self.filePath = filePath
-        self.fileSize = dataSize # note that files will have a value passed in
-        self.children = children # keeps track of all subnodes
-        self.isDir = isDir
-    
-    def addSubfile(self, childNode):
-        if self.children is None:
-            self.children = list()
-        self.children.append(childNode)
-
-    def setFileSize(self, newSize: int):
-        self.fileSize = newSize
+# Keep a flat index of the directories instead of a tree of nodes.
+# Every directory gets an integer id, with its parent and its total
+# size stored in arrays under that id. A file only adds its size to
+# the current directory's pending total, which is handed to the parent
+# when we cd out of it (or when the log ends). Sizes are therefore
+# complete after a single pass without keeping any path strings or
+# recursing, no matter how long the log or how deep the tree.
+#
+# Once the log is ingested the sizes are also sorted once, so repeated
+# queries (dirs under X, smallest dir of at least Y, top K) are just
+# bisections over that order instead of another walk or parse.
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+
+class DirIndex:
+    ROOT_ID = 0
+
+    def __init__(self):
+        self.parents = array('q', [-1])
+        self.sizes = array('q', [0])
+        self.pendingSizes = array('q', [0])
+        self.childIds = dict() # (parent id, dir name) -> dir id
+        self.names = ["/"]
+
+        # filled in by buildSizeOrder once ingestion is done
+        self.sortedSizes = list()
+        self.sortedIds = list()
+        self.sizePrefix = [0]
+
+    def getChildDir(self, parentId: int, dirName: str) -> int:
+        dirKey = (parentId, dirName)
+        if dirKey not in self.childIds:
+            self.childIds[dirKey] = len(self.parents)
+            self.parents.append(parentId)
+            self.sizes.append(0)
+            self.pendingSizes.append(0)
+            self.names.append(dirName)
+        return self.childIds[dirKey]
+
+    def addFile(self, dirId: int, fileSize: int) -> None:
+        self.sizes[dirId] += fileSize
+        self.pendingSizes[dirId] += fileSize
+
+    # Hands the pending total of a directory to its parent and returns the parent.
+    # Like a shell, leaving the root keeps us at the root.
+    def leaveDir(self, dirId: int) -> int:
+        if dirId == self.ROOT_ID:
+            return dirId
+        parentId = self.parents[dirId]
+        self.sizes[parentId] += self.pendingSizes[dirId]
+        self.pendingSizes[parentId] += self.pendingSizes[dirId]
+        self.pendingSizes[dirId] = 0
+        return parentId
+
+    def leaveToRoot(self, dirId: int) -> int:
+        while dirId != self.ROOT_ID:
+            dirId = self.leaveDir(dirId)
+        return dirId
+
+    def getDirPath(self, dirId: int) -> str:
+        pathParts = list()
+        while dirId != self.ROOT_ID:
+            pathParts.append(self.names[dirId])
+            dirId = self.parents[dirId]
+        return "/" + "/".join(reversed(pathParts))
+
+    ############### SIZE QUERIES ####################
+    def buildSizeOrder(self) -> None:
+        self.sortedIds = sorted(range(len(self.sizes)), key = self.sizes.__getitem__)
+        self.sortedSizes = [self.sizes[dirId] for dirId in self.sortedIds]
+        self.sizePrefix = [0] + list(accumulate(self.sortedSizes))
+
+    # ids of every directory of at most maxSize
+    def dirsAtMost(self, maxSize: int) -> list[int]:
+        return self.sortedIds[:bisect_right(self.sortedSizes, maxSize)]
+
+    def sumAtMost(self, maxSize: int) -> int:
+        return self.sizePrefix[bisect_right(self.sortedSizes, maxSize)]
+
+    # size of the smallest directory of at least minSize, or -1 if there is none
+    def smallestAtLeast(self, minSize: int) -> int:
+        sizeInd = bisect_left(self.sortedSizes, minSize)
+        return self.sortedSizes[sizeInd] if sizeInd < len(self.sortedSizes) else -1
+
+    # (id, size) of the numDirs largest directories, largest first
+    def largestDirs(self, numDirs: int) -> list[tuple[int, int]]:
+        numDirs = min(numDirs, len(self.sortedIds))
+        return [(self.sortedIds[sizeInd], self.sortedSizes[sizeInd]) for sizeInd in range(len(self.sortedIds) - 1, len(self.sortedIds) - 1 - numDirs, -1)]
 
 # ingests the file
-def ingestUserInputs(inFile: str) -> Node:
-    # initialize values for parsing
-    curPath = "/"
-    rootDir = Node("/", isDir = True)
-    curDir = rootDir
-    nodeMap = {"/":rootDir}
+def ingestUserInputs(inFile: str) -> DirIndex:
+    dirIndex = DirIndex()
+    curDir = DirIndex.ROOT_ID
 
     with open(inFile, 'r') as cmdHist:
-        curLine = cmdHist.readline()
-        curLine = cmdHist.readline()
-        while curLine:
+        for curLine in cmdHist:
             splitToks = curLine.split()
+            if not splitToks:
+                continue
+
             if splitToks[0] == "$" and len(splitToks) == 3: # current line is a cd
-                if splitToks[-1] == '..':
-                    curPath = "/".join(curPath.split("/")[:-1]) # step out one dir
-                    if not curPath:
-                        curPath = "/" # stepped out to root
+                if splitToks[-1] == '/':
+                    curDir = dirIndex.leaveToRoot(curDir)
+                elif splitToks[-1] == '..':
+                    curDir = dirIndex.leaveDir(curDir) # step out one dir
                 else:
-                    curPath += ("/" if curPath!="/" else "") + splitToks[-1] # or append to cur working dir
-                curDir = nodeMap[curPath]                       # grab new rel node
+                    curDir = dirIndex.getChildDir(curDir, splitToks[-1])
             elif splitToks[0] == "$": # ls nodes can be skipped
                 pass
-            else: # current line is a file/dir listing
-                tempFile = Node(curPath + ("/" if curPath!="/" else "") + splitToks[-1])
-                if splitToks[0] == "dir":
-                    nodeMap[curPath + ("/" if curPath!="/" else "") + splitToks[-1]] = tempFile # save ref
-                    tempFile.isDir = True
-                else:
-                    tempFile.setFileSize(int(splitToks[0]))
-
-                # add to current dir as subfile
-                curDir.addSubfile(tempFile)
-
-            # parse next line
-            curLine = cmdHist.readline()
-
-    # Now populate the filesizes for all directories properly...
-    populateFilesizes(rootDir)
-
-    return rootDir
-
-# recursively calculates the size of the current node by determining the size of the
-# children.
-def populateFilesizes(curDir: Node)->int:
-    if curDir.children:
-        curDir.setFileSize(sum([populateFilesizes(subNode) for subNode in curDir.children]))
-
-    return curDir.fileSize
-
-def p1Soln(inFile: str) -> int:
-    # set up problem
-    rootNode = ingestUserInputs(inFile)
-
-    # with the tree structure we can just iterate on the desired predicate and add these values...
-    nodeStack = [rootNode]
-    totalSize = 0
-    filterPredicate = lambda dirFilesize : dirFilesize <= 100000
-    while(nodeStack):
-        # check predicate correctness on last node in stack
-        curNode = nodeStack.pop()
-        if curNode.isDir:
-            if filterPredicate(curNode.fileSize):
-                totalSize += curNode.fileSize
+            elif splitToks[0] == "dir":
+                dirIndex.getChildDir(curDir, splitToks[-1])
+            else: # current line is a file listing
+                dirIndex.addFile(curDir, int(splitToks[0]))
 
-            # otherwise just add children directories to list
-            if curNode.children is not None:
-                [nodeStack.append(subNode) for subNode in curNode.children if subNode.isDir]
+    # whatever is still pending belongs to every dir up to the root
+    dirIndex.leaveToRoot(curDir)
+    dirIndex.buildSizeOrder()
+    return dirIndex
 
-    return totalSize
+def p1Soln(dirIndex: DirIndex) -> int:
+    return dirIndex.sumAtMost(100000)
 
 ###############################################################
 #   Soln for P2 of Day 7 for AoC
@@ -110,38 +141,19 @@ def p1Soln(inFile: str) -> int:
 # Notice that this is just an optimization problem. Find the smallest
 # value that is larger than (70 000 000 - sizeof("/")).
 ###############################################################
-def p2Soln(inFile: str, totFSSize: int, updateSize: int) -> int:
-     # set up problem
-    rootNode = ingestUserInputs(inFile)
-
-    # with the tree structure we can just iterate on the desired predicate to optimize
-    nodeStack = [rootNode]
-    curToDelSize = rootNode.fileSize + 1
-    curAvailable = totFSSize - rootNode.fileSize
-    reqDeletionSize = updateSize - curAvailable
-    filterPredicate = lambda dirFilesize : dirFilesize >= reqDeletionSize
-    while(nodeStack):
-        # check predicate correctness on last node in stack
-        curNode = nodeStack.pop()
-        if curNode.isDir:
-            if filterPredicate(curNode.fileSize):
-                if curNode.fileSize < curToDelSize:
-                    curToDelSize = curNode.fileSize
-
-                # otherwise just add relevant children directories to list
-                if curNode.children is not None:
-                    [nodeStack.append(subNode) for subNode in curNode.children if subNode.isDir]
-
-    return curToDelSize
+def p2Soln(dirIndex: DirIndex, totFSSize: int, updateSize: int) -> int:
+    reqDeletionSize = updateSize - (totFSSize - dirIndex.sizes[DirIndex.ROOT_ID])
+    return dirIndex.smallestAtLeast(reqDeletionSize)
 
 if __name__ == "__main__":
-    # prepare env for p1
+    # prepare env for both parts
     inFile = "./2022/Day07/input"
+    dirIndex = ingestUserInputs(inFile)
 
     # evaluate on p1 algo
-    soln1 = p1Soln(inFile)
+    soln1 = p1Soln(dirIndex)
     print("Solution for part 1 of the problem is {}".format(soln1))
 
     # evaluate on p2 algo
-    soln2 = p2Soln(inFile, 70000000, 30000000)
-    print("Solution for part 2 of the problem is {}".format(soln2))
\ No newline at end of file
+    soln2 = p2Soln(dirIndex, 70000000, 30000000)
+    print("Solution for part 2 of the problem is {}".format(soln2))
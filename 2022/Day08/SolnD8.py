@@ -8,63 +8,34 @@
 #     in question following a cardinal direction (NSWE) where all
 #     tree sizes are strictly increasing. 
 ###############################################################
-# This can use a DP method to solve but it would require two passes
-# in order to consolidate information. Instead, it's simpler to use
-# a BFS starting from all outer nodes and simply propagate the information
-# through the map. This will use O(NxM) size to store but should function
-# the simplest.
-class CARDINAL_DIRS():
-    NORTH = (-1, 0)
-    EAST = (0, 1)
-    SOUTH = (1, 0)
-    WEST = (0, -1)
-
-# Extracts all matrix edges along with appending them with their appropriate exploration
-# direction.
-def extractMatEdgesAndDirs(inMat: list[list]) -> tuple[tuple[int, int], CARDINAL_DIRS]:
-    edgesAndDirs = list()
-
-    # extract all non-outermost edges
-    topRefs = zip([0]*(len(inMat[0])-2), range(1,len(inMat[0])-1))
-    botRefs = zip([len(inMat)-1]*(len(inMat[0])-2), range(1, len(inMat[0])-1))
-    leftRefs = zip(range(1,len(inMat)-1), [0]*(len(inMat)-2))
-    rightRefs = zip(range(1,len(inMat)-1), [len(inMat[0])-1]*(len(inMat)-2))
-    totRefs = [topRefs, botRefs, leftRefs, rightRefs]
-    totDirs = [CARDINAL_DIRS.SOUTH, CARDINAL_DIRS.NORTH, CARDINAL_DIRS.EAST, CARDINAL_DIRS.WEST]
-
-    for setInd in range(len(totRefs)):
-        edgesAndDirs.extend([(point, totDirs[setInd]) for point in totRefs[setInd]])
-
-    return edgesAndDirs
-
-def p1Soln(inFile: str) -> int:
-    # prepare the data for processing by reading in the height matrix
-    hMat = list()
-    with open(inFile, 'r') as heightRecs:
-        curLine = heightRecs.readline()
-        while curLine:
-            hMat.append([int(hVal) for hVal in curLine.strip()])
-            curLine = heightRecs.readline()
-    visibleList = [[0] * len(hMat[0]) for _ in range(len(hMat))]
-
-    # good lord naive O(4*N*M) traversal-like solution
-    toVisit = extractMatEdgesAndDirs(hMat)
-    validPoint = lambda x,y : (0 <= x < len(hMat)) and (0 <= y < len(hMat[0]))
-    for (point, deltas) in toVisit:
-        curX, curY = point[0], point[1]
-        deltaX, deltaY = deltas[0], deltas[1]
-        visibleList[curX][curY] = 1
-        curHeight = hMat[curX][curY]
-
-        while(validPoint(curX+deltaX, curY+deltaY)):
-            curX += deltaX
-            curY += deltaY
-            newHeight = hMat[curX][curY]
-            # need to take care of adjusting heights when not strictly increasing
-            visibleList[curX][curY] = 1 if newHeight > curHeight else visibleList[curX][curY]
-            curHeight = newHeight if newHeight > curHeight else curHeight
-    
-    return sum([sum(row) for row in visibleList]) + 4
+# A tree is visible from the west exactly when it is taller than the
+# running maximum of everything west of it, which is a cumulative max
+# along the rows. The other three directions are the same thing on the
+# flipped or transposed grid, so everything stays vectorized.
+import numpy as np
+
+# Reads the whole height matrix in one go as a uint8 array
+def loadHeightGrid(inFile: str) -> np.ndarray:
+    with open(inFile, 'rb') as heightRecs:
+        rawHeights = heightRecs.read().replace(b"\r", b"").strip()
+    # a single row has no newline left after the strip
+    numCols = rawHeights.find(b"\n")
+    numCols = numCols if numCols >= 0 else len(rawHeights)
+    rawHeights = rawHeights.replace(b"\n", b"")
+    return (np.frombuffer(rawHeights, dtype = np.uint8) - ord('0')).reshape(-1, numCols)
+
+# Marks trees visible from the west (column 0) side
+def visibleFromWest(hGrid: np.ndarray) -> np.ndarray:
+    prevMax = np.full(hGrid.shape, -1, dtype = np.int16)
+    prevMax[:, 1:] = np.maximum.accumulate(hGrid, axis = 1)[:, :-1]
+    return hGrid > prevMax
+
+def p1Soln(hGrid: np.ndarray) -> int:
+    visible = visibleFromWest(hGrid)
+    visible |= visibleFromWest(hGrid[:, ::-1])[:, ::-1]
+    visible |= visibleFromWest(hGrid.T).T
+    visible |= visibleFromWest(hGrid.T[:, ::-1])[:, ::-1].T
+    return int(np.count_nonzero(visible))
 
 ###############################################################
 #   Soln for P2 of Day 8 for AoC
@@ -76,55 +47,49 @@ def p1Soln(inFile: str) -> int:
 #     all the trees visible in each of the four cardinal directions.
 #     Unlike before, calculation terminates the moment the view is
 #     blocked by a tree of the same height.
+#
+# Observation:
+#     Walking outward from every tree is O(N*M*(N+M)). Sweeping a row
+#     from the west instead, the view of a tree ends at the closest
+#     tree to its west that is at least as tall. That is what a
+#     monotonic stack finds, and since there are only a handful of
+#     heights the stack collapses into a table holding the last column
+#     at which each height (or taller) was seen. Sweeping all rows at
+#     once column by column keeps the whole thing O(N*M) in NumPy.
 ###############################################################
-def p2Soln(inFile: str) -> int:
-    # prepare the data for processing by reading in the height matrix
-    hMat = list()
-    with open(inFile, 'r') as heightRecs:
-        curLine = heightRecs.readline()
-        while curLine:
-            hMat.append([int(hVal) for hVal in curLine.strip()])
-            curLine = heightRecs.readline()
-
-    # we must traverse the entire matrix calculating these scores
-    # in all directions...
-    validPoint = lambda x,y : (0 <= x < len(hMat)) and (0 <= y < len(hMat[0]))
-    dirsToCheck = [CARDINAL_DIRS.NORTH, CARDINAL_DIRS.EAST, 
-                  CARDINAL_DIRS.SOUTH, CARDINAL_DIRS.WEST]
-    maxScore = 0
-    for xInd in range(1,len(hMat)-1):
-        for yInd in range(1,len(hMat[0])-1):
-            locHeight = hMat[xInd][yInd]
-            curScore = 1
-
-            for deltaX, deltaY in dirsToCheck:
-                curMultiple = 0
-                curX, curY = xInd + deltaX, yInd + deltaY
-                while(validPoint(curX, curY)):
-                    curMultiple += 1
-
-                    if hMat[curX][curY] >= locHeight:
-                        break
-                    curX, curY = curX + deltaX, curY + deltaY
-
-                # update score
-                curScore *= curMultiple
-
-            # check max 
-            if curScore > maxScore:
-                maxScore = curScore
-
-    return maxScore
+# Viewing distance of every tree towards the west (column 0) side
+def viewDistWest(hGrid: np.ndarray) -> np.ndarray:
+    numRows, numCols = hGrid.shape
+    heightLevels = np.arange(int(hGrid.max()) + 1, dtype = hGrid.dtype)[:, None]
+    rowInds = np.arange(numRows)
+
+    # the edge acts as a blocker at column 0, which also gives edge trees 0
+    lastBlock = np.zeros((len(heightLevels), numRows), dtype = np.int32)
+    viewDists = np.empty(hGrid.shape, dtype = np.int32)
+    for colInd in range(numCols):
+        colHeights = hGrid[:, colInd]
+        viewDists[:, colInd] = colInd - lastBlock[colHeights, rowInds]
+        lastBlock[heightLevels <= colHeights] = colInd
+
+    return viewDists
+
+def p2Soln(hGrid: np.ndarray) -> int:
+    scenicScores = viewDistWest(hGrid).astype(np.int64)
+    scenicScores *= viewDistWest(hGrid[:, ::-1])[:, ::-1]
+    scenicScores *= viewDistWest(hGrid.T).T
+    scenicScores *= viewDistWest(hGrid.T[:, ::-1])[:, ::-1].T
+    return int(scenicScores.max())
 
 
 if __name__ == "__main__":
-    # Set up env for p1
+    # Set up env for both parts
     inFile = "./2022/Day08/input"
+    hGrid = loadHeightGrid(inFile)
 
     # Process algo for p1
-    soln1 = p1Soln(inFile)
+    soln1 = p1Soln(hGrid)
     print("Solution for part 1 is {}".format(soln1))
 
     # Process algo for p2
-    soln2 = p2Soln(inFile)
-    print("Solution for part 2 is {}".format(soln2))
\ No newline at end of file
+    soln2 = p2Soln(hGrid)
+    print("Solution for part 2 is {}".format(soln2))
@@ -117,17 +117,103 @@ def tailSimExecutor(inFile: str, simModel: ChaseSimulation|ChaseHarness) -> int:
 
     return simModel.getFinalTailPosCount()
 
+###############################################################
+#   Array rope engine for P1 and P2
+#
+# Observation:
+#     The harness above pays for several lambda calls, tuple
+#     allocations and a set insert per knot per step, and every
+#     segment remembers its history even if nobody asks for it. All
+#     knots can instead live in two int arrays updated in place. A
+#     knot that does not move cannot move the ones behind it, so each
+#     step stops at the first knot that stays put. Knots never leave
+#     the box the head has travelled through, which lets the visited
+#     cells of the requested knots be a bitmap over that box. Since
+#     the first knot of a long rope moves exactly like the tail of a
+#     short one, both parts come out of a single run.
+###############################################################
+from array import array
+
+# Reads the commands as (dRow, dCol, numSteps) runs alongside the
+# (minRow, minCol, maxRow, maxCol) box covered by the head
+def parseMoves(inFile: str) -> tuple[list[tuple[int, int, int]], tuple[int, int, int, int]]:
+    cmdDict = {"R":(0, 1), "U":(-1, 0), "D":(1, 0), "L":(0, -1)}
+    moveRuns = list()
+    curRow, curCol = 0, 0
+    minRow = minCol = maxRow = maxCol = 0
+
+    with open(inFile, 'r') as cmdList:
+        for curLine in cmdList:
+            if not curLine.strip():
+                continue
+            dirToMove, numSteps = curLine.split()
+            (dRow, dCol), numSteps = cmdDict[dirToMove], int(numSteps)
+            moveRuns.append((dRow, dCol, numSteps))
+
+            curRow, curCol = curRow + dRow*numSteps, curCol + dCol*numSteps
+            minRow, maxRow = min(minRow, curRow), max(maxRow, curRow)
+            minCol, maxCol = min(minCol, curCol), max(maxCol, curCol)
+
+    return moveRuns, (minRow, minCol, maxRow, maxCol)
+
+class RopeEngine:
+    def __init__(self, numKnots: int, trackedKnots: tuple[int, ...], bounds: tuple[int, int, int, int]):
+        minRow, minCol, maxRow, maxCol = bounds
+        self.numKnots = numKnots
+        self.width = maxCol - minCol + 1
+        # knots are stored shifted into the box so cell keys are never negative
+        self.rows = array('i', [-minRow] * numKnots)
+        self.cols = array('i', [-minCol] * numKnots)
+
+        self.isTracked = bytearray(numKnots)
+        self.visited = dict()
+        self.visitCounts = dict()
+        startKey = self.rows[0]*self.width + self.cols[0]
+        for knotInd in trackedKnots:
+            self.isTracked[knotInd] = 1
+            self.visited[knotInd] = bytearray((maxRow - minRow + 1) * self.width)
+            self.visited[knotInd][startKey] = 1
+            self.visitCounts[knotInd] = 1
+
+    def applyMove(self, dRow: int, dCol: int, numSteps: int) -> None:
+        rows, cols, isTracked = self.rows, self.cols, self.isTracked
+        for _ in range(numSteps):
+            rows[0] += dRow
+            cols[0] += dCol
+            for knotInd in range(1, self.numKnots):
+                rowGap = rows[knotInd-1] - rows[knotInd]
+                colGap = cols[knotInd-1] - cols[knotInd]
+                # still touching, so nothing further down the rope moves
+                if -1 <= rowGap <= 1 and -1 <= colGap <= 1:
+                    break
+                rows[knotInd] += (rowGap > 0) - (rowGap < 0)
+                cols[knotInd] += (colGap > 0) - (colGap < 0)
+
+                if isTracked[knotInd]:
+                    cellKey = rows[knotInd]*self.width + cols[knotInd]
+                    if not self.visited[knotInd][cellKey]:
+                        self.visited[knotInd][cellKey] = 1
+                        self.visitCounts[knotInd] += 1
+
+    def run(self, moveRuns: list[tuple[int, int, int]]) -> "RopeEngine":
+        for dRow, dCol, numSteps in moveRuns:
+            self.applyMove(dRow, dCol, numSteps)
+        return self
+
+    def getUniquePosCount(self, knotInd: int) -> int:
+        return self.visitCounts[knotInd]
+
 if __name__ == "__main__":
-    # prepare env for p1
+    # prepare env for both parts
     inFile = "./2022/Day09/input"
+    moveRuns, bounds = parseMoves(inFile)
 
-    # evaluate on p1
-    p1Sim = ChaseSimulation(sLoc = (0,0))
-    sol1 = tailSimExecutor(inFile, p1Sim)
+    # the second knot is the p1 tail and the tenth is the p2 tail
+    tailSize = 9
+    ropeSim = RopeEngine(tailSize + 1, trackedKnots = (1, tailSize), bounds = bounds).run(moveRuns)
+
+    sol1 = ropeSim.getUniquePosCount(1)
     print("The solution for part 1 is {}".format(sol1))
 
-    # evalute on p2 now
-    tailSize = 9
-    p2Sim = ChaseHarness(sLoc = (0,0), tailLength = tailSize)
-    sol2 = tailSimExecutor(inFile, p2Sim)
-    print("The solution for part 2 is {}".format(sol2))
\ No newline at end of file
+    sol2 = ropeSim.getUniquePosCount(tailSize)
+    print("The solution for part 2 is {}".format(sol2))
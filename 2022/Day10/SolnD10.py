@@ -9,41 +9,38 @@
 #     values of (20 + 40*n).
 #
 # Observation:
-#     We are simulating a single thread computer with specific operation times.
-#     We can "queue" an operation and then wait the appropriate cycle
-#     time for it to finish.
+#     We are simulating a single thread computer with specific operation
+#     times, but only ever one op is in flight. Rather than queueing ops
+#     by completion cycle, the program can be compiled once into the
+#     value the register holds during every cycle (noop repeats it once,
+#     addx twice and then applies its operand). Both parts then only
+#     read slices of that trace.
 ###############################################################
-import heapq
+from array import array
+import numpy as np
 
-def p1Soln(inFile: str) -> int:
-    # set some initial values for our CPU
-    jobQueue = list()
-    cycleVal = 1
-    registerVal = 1
-    cycleDict = {"noop":1, "addx":2}
-    notedSignal = 0
+CYCLE_COUNTS = {"noop":1, "addx":2}
 
-    with open(inFile, 'r') as progCmds:
-        curLine = progCmds.readline()
-        while curLine or jobQueue:
-            # beginning of cycle (queue op if queue empty)
-            if len(jobQueue) == 0:
-                curOp = curLine.rstrip().split()
-                finCycle = cycleVal + cycleDict[curOp[0]]
-                jobReq = (finCycle, 0) if len(curOp) == 1 else (finCycle, int(curOp[1]))
-                heapq.heappush(jobQueue, jobReq)
-                curLine = progCmds.readline()
+# Returns the register value during each cycle; entry i belongs to cycle i+1
+def compileTrace(inFile: str, startVal: int = 1) -> array:
+    regTrace = array('q')
+    registerVal = startVal
 
-            # record interesting elements
-            if (cycleVal-20)%40 == 0:
-                notedSignal += cycleVal * registerVal
+    with open(inFile, 'r') as progCmds:
+        for curLine in progCmds:
+            curOp = curLine.split()
+            if not curOp:
+                continue
+            regTrace.extend([registerVal] * CYCLE_COUNTS[curOp[0]])
+            if len(curOp) > 1:
+                registerVal += int(curOp[1])
 
-            # end of cycle (process queue)
-            cycleVal += 1
-            while len(jobQueue) > 0 and jobQueue[0][0] == cycleVal:
-                registerVal += heapq.heappop(jobQueue)[1]
+    return regTrace
 
-    return notedSignal
+def p1Soln(regTrace: array, firstCycle: int = 20, cycleStep: int = 40) -> int:
+    regVals = np.frombuffer(regTrace, dtype = np.int64)
+    notedCycles = np.arange(firstCycle, len(regVals) + 1, cycleStep, dtype = np.int64)
+    return int(np.dot(notedCycles, regVals[notedCycles - 1]))
 
 ###############################################################
 #   Soln for P1 of Day 10 for AoC
@@ -54,10 +51,8 @@ def p1Soln(inFile: str) -> int:
 #     a CRT that is 40 x 6 and update the value of the screen to be
 #     turned on only if any pixel of the three-char-wide element is
 #     located on the updated pixel in question.
-#     It's pretty much the same as above but the mid-cycle action
-#     has now been swapped out for something different. Refactoring
-#     based on some mid-cycle functor can prob work, but it's more
-#     effort than necessary for this.
+#     With the trace above, the pixel drawn at each cycle is a single
+#     comparison between the register and the column being drawn.
 ###############################################################
 # reshapes the screen to properly render solution
 def reshapeScreen(screenString: str, screenWidth: int) -> str:
@@ -67,43 +62,25 @@ def reshapeScreen(screenString: str, screenWidth: int) -> str:
 
     return fixedString
 
-def p2Soln(inFile: str, screenWidth: int, screenHeight: int) -> str:
-    # readies our CPU yet again
-    jobQueue = list()
-    cycleVal = 1
-    registerVal = 1
-    cycleDict = {"noop":1, "addx":2}
-    screenOutput = ["-"] * (screenHeight * screenWidth)
-
-    with open(inFile, 'r') as progCmds:
-        curLine = progCmds.readline()
-        while curLine or jobQueue:
-            # beginning of cycle (queue op if queue empty)
-            if len(jobQueue) == 0:
-                curOp = curLine.rstrip().split()
-                finCycle = cycleVal + cycleDict[curOp[0]]
-                jobReq = (finCycle, 0) if len(curOp) == 1 else (finCycle, int(curOp[1]))
-                heapq.heappush(jobQueue, jobReq)
-                curLine = progCmds.readline()
-
-            # update our screen's image (mid cycle)
-            screenOutput[cycleVal-1] = "█" if registerVal-1 <= (cycleVal-1)%screenWidth <= registerVal+1 else " "
-
-            # end of cycle (process queue)
-            cycleVal += 1
-            while len(jobQueue) > 0 and jobQueue[0][0] == cycleVal:
-                registerVal += heapq.heappop(jobQueue)[1]
+def p2Soln(regTrace: array, screenWidth: int, screenHeight: int) -> str:
+    regVals = np.frombuffer(regTrace, dtype = np.int64)[:screenHeight * screenWidth]
+    drawnCols = np.arange(len(regVals)) % screenWidth
+    isLit = np.abs(regVals - drawnCols) <= 1
 
+    # pixels past the end of the program are never drawn
+    screenOutput = ["-"] * (screenHeight * screenWidth)
+    screenOutput[:len(regVals)] = np.where(isLit, "█", " ").tolist()
     return reshapeScreen("".join(screenOutput), screenWidth)
 
 if __name__ == "__main__":
-    # prepare env for p1
+    # prepare env for both parts
     inFile = "./2022/Day10/input"
+    regTrace = compileTrace(inFile)
     
     # execute algo for p1
-    sol1 = p1Soln(inFile)
+    sol1 = p1Soln(regTrace)
     print("Solution for p1 is {}".format(sol1))
 
     # execute algo for p2
-    sol2 = p2Soln(inFile, 40, 6)
-    print("Solution for p2 is \n{}".format(sol2))
\ No newline at end of file
+    sol2 = p2Soln(regTrace, 40, 6)
+    print("Solution for p2 is \n{}".format(sol2))
@@ -16,6 +16,8 @@
 #     thing from blowing up.
 ###############################################################
 from typing import Callable
+from collections import Counter
+import numpy as np
 
 '''
     MonkeySim
@@ -31,6 +33,7 @@ class MonkeySim:
         self.monkeyBaggage = list()
         self.monkeyOps = list()
         self.monkeyThrowConds = list()
+        self.monkeyParams = list()
         self.curRound = 1
         self.numInspections = dict()
         self.redAfterRnd = reduceWorryAfterRound
@@ -69,6 +72,104 @@ class MonkeySim:
             self.monkeyBaggage[monkeyInd] = list()
         self.curRound += 1
 
+    # Counts the inspections every monkey makes over the next numRounds rounds
+    # without moving anything. Items never interact, so each one can be followed
+    # on its own, and identical items only need to be followed once.
+    def projectInspections(self, numRounds: int) -> list[int]:
+        startStates = Counter((monkeyInd, itemVal) for monkeyInd, itemList in enumerate(self.monkeyBaggage)
+                                                   for itemVal in itemList)
+        totInspections = [0] * len(self.monkeyBaggage)
+        for startState, numItems in startStates.items():
+            for monkeyInd, itemInspections in enumerate(self.trackItem(startState, numRounds)):
+                totInspections[monkeyInd] += numItems * itemInspections
+
+        return totInspections
+
+    # Follows one (monkey, worry) state round by round until either numRounds is
+    # reached or the state at the start of a round repeats. Once it repeats the
+    # rounds in between form a cycle, so the rest is extrapolated from it.
+    def trackItem(self, startState: tuple[int, int], numRounds: int) -> list[int]:
+        seenRounds = dict()
+        roundVisits = list()
+        curState = startState
+        while len(roundVisits) < numRounds and curState not in seenRounds:
+            seenRounds[curState] = len(roundVisits)
+            curState, visits = self._itemRound(*curState)
+            roundVisits.append(visits)
+
+        # every round is weighted by how many times it occurs within numRounds
+        if len(roundVisits) == numRounds:
+            cycleStart, numCycles, remRounds = numRounds, 0, 0
+        else:
+            cycleStart = seenRounds[curState]
+            numCycles, remRounds = divmod(numRounds - cycleStart, len(roundVisits) - cycleStart)
+
+        itemInspections = [0] * len(self.monkeyBaggage)
+        for roundInd, visits in enumerate(roundVisits):
+            roundWeight = 1 if roundInd < cycleStart else numCycles + (roundInd - cycleStart < remRounds)
+            for monkeyInd in visits:
+                itemInspections[monkeyInd] += roundWeight
+
+        return itemInspections
+
+    # Moves a single item through one round. It keeps going while it is thrown
+    # to monkeys that have yet to act this round.
+    def _itemRound(self, monkeyInd: int, worryVal: int) -> tuple[tuple[int, int], tuple[int, ...]]:
+        visits = list()
+        while True:
+            visits.append(monkeyInd)
+            worryVal = self.monkeyOps[monkeyInd](worryVal)
+            worryVal = self.reduceWorryFunc(worryVal) if self.redAfterRnd else worryVal % self.moduloVal
+            nextMonkeyInd = self.monkeyThrowConds[monkeyInd](worryVal)
+            if nextMonkeyInd <= monkeyInd:
+                return (nextMonkeyInd, worryVal), tuple(visits)
+            monkeyInd = nextMonkeyInd
+
+    # Runs numRounds rounds with every item held in one int64 array next to an
+    # array of owners. Each monkey's turn applies its operation and throw test to
+    # its whole bucket at once, which pays off once monkeys hold many items.
+    def simulateRoundsBatched(self, numRounds: int) -> None:
+        numMonkeys = len(self.monkeyBaggage)
+        itemWorry = np.array([itemVal for itemList in self.monkeyBaggage for itemVal in itemList], dtype = np.int64)
+        itemOwner = np.repeat(np.arange(numMonkeys), [len(itemList) for itemList in self.monkeyBaggage])
+        int64Max = np.iinfo(np.int64).max
+
+        # under the modulo every product is at most (moduloVal-1) * max(moduloVal-1, operand)
+        if not self.redAfterRnd:
+            itemWorry %= self.moduloVal
+            maxFactor = max([self.moduloVal - 1] + [operand for op, operand, *_ in self.monkeyParams if op == "*" and operand])
+            if (self.moduloVal - 1) * maxFactor > int64Max:
+                raise OverflowError("Worry values modulo {} do not fit in int64".format(self.moduloVal))
+
+        roundInspections = np.zeros(numMonkeys, dtype = np.int64)
+        for _ in range(numRounds):
+            for monkeyInd, (op, operand, val3, y1, y2) in enumerate(self.monkeyParams):
+                bucket = np.flatnonzero(itemOwner == monkeyInd)
+                if not len(bucket):
+                    continue
+                bucketVals = itemWorry[bucket]
+
+                # without the modulo nothing bounds the values, so check before growing them
+                if self.redAfterRnd:
+                    maxVal = int(bucketVals.max())
+                    if maxVal * (operand if operand is not None else maxVal) > int64Max:
+                        raise OverflowError("Worry values outgrew int64 on monkey {}".format(monkeyInd))
+
+                # inspect items
+                opVals = bucketVals if operand is None else operand
+                bucketVals = bucketVals * opVals if op == "*" else bucketVals + opVals
+                bucketVals = bucketVals // 3 if self.redAfterRnd else bucketVals % self.moduloVal
+
+                # throw the whole bucket
+                itemWorry[bucket] = bucketVals
+                itemOwner[bucket] = np.where(bucketVals % val3 == 0, y1, y2)
+                roundInspections[monkeyInd] += len(bucket)
+
+        for monkeyInd in range(numMonkeys):
+            self.numInspections[monkeyInd] = self.numInspections.get(monkeyInd, 0) + int(roundInspections[monkeyInd])
+        self.monkeyBaggage = [itemWorry[itemOwner == monkeyInd].tolist() for monkeyInd in range(numMonkeys)]
+        self.curRound += numRounds
+
     def getNumInspections(self) -> list[int]:
         return list(self.numInspections.values())
 
@@ -123,16 +224,33 @@ class MonkeySim:
             self.monkeyBaggage.append(itemList)
             self.monkeyOps.append(monkeyOpFunc)
             self.monkeyThrowConds.append(testOpFunc)
+            self.monkeyParams.append((op, int(val2) if val2 != "old" else None, val3, y1, y2))
             self.moduloVal *= val3
 
-def p1Soln(inFile: str, numRounds: int, redAfterRound: bool = True, printCond: Callable = lambda roundIter: False) -> int:
+# "rounds" moves every item through each round, "batched" does the same with
+# NumPy over whole buckets, and "trajectory" follows each item on its own with
+# cycle detection (printCond is only used by "rounds")
+ENGINES = ("rounds", "batched", "trajectory")
+
+def p1Soln(inFile: str, numRounds: int, redAfterRound: bool = True, printCond: Callable = lambda roundIter: False,
+           engine: str = "rounds") -> int:
+    if engine not in ENGINES:
+        raise ValueError("Unknown engine '{}', expected one of {}".format(engine, ENGINES))
+
     # initialize simulator and simulate
     p1Sim = MonkeySim(inFile, reduceWorryAfterRound = redAfterRound)
-    for roundIter in range(numRounds):
-        p1Sim.simulateRound()
-        if printCond(roundIter):
-            print(p1Sim)
-    topInspects = sorted(p1Sim.getNumInspections(), reverse = True)
+    if engine == "trajectory":
+        numInspections = p1Sim.projectInspections(numRounds)
+    elif engine == "batched":
+        p1Sim.simulateRoundsBatched(numRounds)
+        numInspections = p1Sim.getNumInspections()
+    else:
+        for roundIter in range(numRounds):
+            p1Sim.simulateRound()
+            if printCond(roundIter):
+                print(p1Sim)
+        numInspections = p1Sim.getNumInspections()
+    topInspects = sorted(numInspections, reverse = True)
 
     return topInspects[0]*topInspects[1]
 
@@ -145,5 +263,5 @@ if __name__ == "__main__":
     print("Solution for part 1 is {}".format(sol1))
 
     # execute algo for p2 (can use the same func as p1)
-    sol2 = p1Soln(inFile, 10000, False)
-    print("Solution for part 2 is {}".format(sol2))
\ No newline at end of file
+    sol2 = p1Soln(inFile, 10000, False, engine = "trajectory")
+    print("Solution for part 2 is {}".format(sol2))
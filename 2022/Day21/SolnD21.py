@@ -9,7 +9,8 @@
 ###############################################################
 # Parses monkeys and returns a dict representing all operation
 # monkeys and all value monkeys.
-from typing import Callable
+from typing import Callable, Optional
+from fractions import Fraction
 
 def parseMonkeys(inFile: str) -> tuple[dict[str, tuple[str, str, str]], dict[str, int]]:
     opDict = dict()
@@ -108,17 +109,186 @@ def calculateMissingVal(missing: str, root: str, oDict: dict[str, tuple[str, str
 
     return backPassVal
 
+###############################################################
+#   Compiled evaluation for P1 and P2
+#
+# Observation:
+#     Both functions above re-walk the name graph recursively and
+#     re-search whole subtrees at every level of the inversion,
+#     which is quadratic in the depth of the tree. Instead, the
+#     graph can be compiled once into integer slots ordered such
+#     that every operand comes before its user. Evaluation is then
+#     a single forward loop over the slots, and the 'humn' -> root
+#     path is found with one pass marking which slots depend on it.
+###############################################################
+OP_SYMBOLS = "+-*/"
+OP_CODES = {opStr: opCode for opCode, opStr in enumerate(OP_SYMBOLS)}
+VAL_CODE = -1
+
+class CompiledMonkeys:
+    # unknown names the one monkey that may be left undefined (it compiles to 0)
+    def __init__(self, oDict: dict[str, tuple[str, str, str]], vDict: dict[str, int], root: str = 'root',
+                 unknown: Optional[str] = None):
+        self.slotOf = dict()
+        self.names = list()
+        self.ops = list()
+        self.lefts = list()
+        self.rights = list()
+        self.consts = list()
+
+        # iterative post-order DFS so deep chains never hit the recursion limit
+        toVisit = [(root, False)]
+        inProgress = set()
+        while toVisit:
+            curMonkey, isExpanded = toVisit.pop()
+            if curMonkey in self.slotOf:
+                continue
+            if curMonkey not in oDict and curMonkey not in vDict and curMonkey != unknown:
+                raise KeyError("Monkey '{}' is referenced but never defined".format(curMonkey))
+
+            if curMonkey in oDict and not isExpanded:
+                # everything above its expanded marker descends from it
+                if curMonkey in inProgress:
+                    raise ValueError("Monkey '{}' depends on itself".format(curMonkey))
+                inProgress.add(curMonkey)
+                lMonkey, _, rMonkey = oDict[curMonkey]
+                toVisit.append((curMonkey, True))
+                toVisit.append((rMonkey, False))
+                toVisit.append((lMonkey, False))
+                continue
+            inProgress.discard(curMonkey)
+
+            self.slotOf[curMonkey] = len(self.names)
+            self.names.append(curMonkey)
+            if curMonkey in oDict:
+                lMonkey, opStr, rMonkey = oDict[curMonkey]
+                self.ops.append(OP_CODES[opStr])
+                self.lefts.append(self.slotOf[lMonkey])
+                self.rights.append(self.slotOf[rMonkey])
+                self.consts.append(0)
+            else:
+                self.ops.append(VAL_CODE)
+                self.lefts.append(-1)
+                self.rights.append(-1)
+                self.consts.append(vDict.get(curMonkey, 0))
+
+        self.rootSlot = self.slotOf[root]
+
+    def evaluate(self, overrides: Optional[dict[str, int]] = None) -> list[int]:
+        vals = list(self.consts)
+        for name, val in (overrides or {}).items():
+            vals[self.slotOf[name]] = val
+
+        for slot, opCode in enumerate(self.ops):
+            if opCode == VAL_CODE:
+                continue
+            lVal, rVal = vals[self.lefts[slot]], vals[self.rights[slot]]
+            match opCode:
+                case 0:
+                    vals[slot] = lVal + rVal
+                case 1:
+                    vals[slot] = lVal - rVal
+                case 2:
+                    vals[slot] = lVal * rVal
+                case 3:
+                    vals[slot] = lVal // rVal
+
+        return vals
+
+    def getRootVal(self) -> int:
+        return self.evaluate()[self.rootSlot]
+
+    # Returns the slots from root down to (but excluding) the missing
+    # monkey, alongside whether each step descends into the left operand.
+    def findPathTo(self, missing: str) -> list[tuple[int, bool]]:
+        missingSlot = self.slotOf[missing]
+        dependsOn = [False] * len(self.ops)
+        dependsOn[missingSlot] = True
+        for slot, opCode in enumerate(self.ops):
+            if opCode != VAL_CODE:
+                dependsOn[slot] = dependsOn[self.lefts[slot]] or dependsOn[self.rights[slot]]
+
+        path = list()
+        curSlot = self.rootSlot
+        while curSlot != missingSlot:
+            lSlot, rSlot = self.lefts[curSlot], self.rights[curSlot]
+            if dependsOn[lSlot] and dependsOn[rSlot]:
+                raise ValueError("Monkey '{}' feeds both operands of '{}'; it cannot be isolated by inversion".format(missing, self.names[curSlot]))
+            leftIsMissing = dependsOn[lSlot]
+            path.append((curSlot, leftIsMissing))
+            curSlot = lSlot if leftIsMissing else rSlot
+
+        return path
+
+    def calculateMissingVal(self, missing: str) -> int:
+        path = self.findPathTo(missing)
+        vals = self.evaluate()
+
+        # root requires equality, so its known branch seeds the inversion
+        rootSlot, leftIsMissing = path[0]
+        backPassVal = vals[self.rights[rootSlot] if leftIsMissing else self.lefts[rootSlot]]
+        for curSlot, leftIsMissing in path[1:]:
+            otherVal = vals[self.rights[curSlot] if leftIsMissing else self.lefts[curSlot]]
+            backPassVal = invOpReader(OP_SYMBOLS[self.ops[curSlot]], leftIsMissing)(backPassVal, otherVal)
+
+        return backPassVal
+
+    # Propagates every slot as an exact linear form a*missing + b instead of
+    # inverting node by node. This does not care about the tree shape, so the
+    # missing monkey may feed any number of branches as long as the result
+    # stays linear in it.
+    def solveLinear(self, missing: str) -> int:
+        missingSlot = self.slotOf[missing]
+        coeffs = [Fraction(0)] * len(self.ops)
+        offsets = [Fraction(val) for val in self.consts]
+        coeffs[missingSlot], offsets[missingSlot] = Fraction(1), Fraction(0)
+
+        for slot, opCode in enumerate(self.ops):
+            if opCode == VAL_CODE:
+                continue
+            lA, lB = coeffs[self.lefts[slot]], offsets[self.lefts[slot]]
+            rA, rB = coeffs[self.rights[slot]], offsets[self.rights[slot]]
+            match opCode:
+                case 0:
+                    coeffs[slot], offsets[slot] = lA + rA, lB + rB
+                case 1:
+                    coeffs[slot], offsets[slot] = lA - rA, lB - rB
+                case 2:
+                    if lA and rA:
+                        raise ValueError("Monkey '{}' multiplies two terms that depend on '{}'".format(self.names[slot], missing))
+                    coeffs[slot], offsets[slot] = lA * rB + rA * lB, lB * rB
+                case 3:
+                    if rA:
+                        raise ValueError("Monkey '{}' divides by a term that depends on '{}'".format(self.names[slot], missing))
+                    if not rB:
+                        raise ValueError("Monkey '{}' divides by zero".format(self.names[slot]))
+                    # constants floor divide like in evaluate; only the missing term stays exact
+                    if not lA:
+                        coeffs[slot], offsets[slot] = Fraction(0), Fraction(lB // rB)
+                    else:
+                        coeffs[slot], offsets[slot] = lA / rB, lB / rB
+
+        # root requires both sides to be equal, so solve (lA - rA)x = rB - lB
+        lSlot, rSlot = self.lefts[self.rootSlot], self.rights[self.rootSlot]
+        netCoeff = coeffs[lSlot] - coeffs[rSlot]
+        if not netCoeff:
+            raise ValueError("Root equality does not depend on '{}'".format(missing))
+        missingVal = (offsets[rSlot] - offsets[lSlot]) / netCoeff
+        if missingVal.denominator != 1:
+            raise ValueError("Root equality has no integer solution ({})".format(missingVal))
+
+        return missingVal.numerator
+
 if __name__ == "__main__":
     # prepare env for p1
     inFile = './2022/Day21/input'
     oDict, vDict = parseMonkeys(inFile)
+    compiled = CompiledMonkeys(oDict, vDict)
 
     # execute algo for p1
-    sol1 = getRootVal('root', oDict, vDict)
+    sol1 = compiled.getRootVal()
     print("Solution for part 1 is {}".format(sol1))
 
     # execute algo for p2
-    del vDict['humn']
-    sol2 = calculateMissingVal('humn', 'root', oDict, vDict)
+    sol2 = compiled.solveLinear('humn')
     print("Solution for part 2 is {}".format(sol2))
-    
\ No newline at end of file
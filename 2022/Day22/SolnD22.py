@@ -17,6 +17,9 @@ class Facing:
     LEFT = (0, -1)
     UP = (-1, 0)
 
+    # index order matches the heading values used in calculateAnswer
+    HEADINGS = (RIGHT, DOWN, LEFT, UP)
+
     @staticmethod
     def calculateAnswer(finRow: int, finCol: int, finHeading: tuple[int, int]) -> int:
         headVal = -1
@@ -136,309 +139,240 @@ def traverseMazeUsingInput(inputs: list[str], mazeWalls: dict, mazeRLims: dict,
 
     return curPos[0], curPos[1], curFacing
 
+###############################################################
+#   Precomputed jump tables for P1
+#
+# Observation:
+#     moveInDirection advances one cell at a time and hits the
+#     wall dict and limit dicts on every step. Since every row and
+#     column of the flat map is just a cycle, we can instead index
+#     cells as r*width + c, record where each cell sits in its row
+#     and column cycle, and precompute how many steps can be taken
+#     in each heading before running into a wall. A move of N steps
+#     is then a single lookup into its cycle regardless of N.
+###############################################################
+from array import array
+
+class FlatMapJumper:
+    HEADINGS = Facing.HEADINGS
+    NO_WALL = -1
+
+    def __init__(self, walls: dict, rLims: dict, cLims: dict):
+        self.width = max([end for _, end in rLims.values()])
+        self.startCell = rLims[0][0]
+        numCells = self.width * len(rLims)
+
+        isWall = bytearray(numCells)
+        for rowInd, colInd in walls:
+            isWall[rowInd * self.width + colInd] = 1
+
+        # axis 0 holds the row cycles and axis 1 the column cycles
+        self.lines = (list(), list())
+        self.lineOf = (array('i', [-1]) * numCells, array('i', [-1]) * numCells)
+        self.posIn = (array('i', [-1]) * numCells, array('i', [-1]) * numCells)
+        for rowInd, (startInd, endInd) in rLims.items():
+            self._addLine(0, [rowInd * self.width + colInd for colInd in range(startInd, endInd)])
+        for colInd, (startInd, endInd) in cLims.items():
+            self._addLine(1, [rowInd * self.width + colInd for rowInd in range(startInd, endInd)])
+
+        # next cell (wrap applied) and steps until a wall for every heading
+        self.nextCell = tuple(array('i', [-1]) * numCells for _ in self.HEADINGS)
+        self.wallDist = tuple(array('i', [self.NO_WALL]) * numCells for _ in self.HEADINGS)
+        for headInd in range(len(self.HEADINGS)):
+            axis, step = headInd % 2, 1 if headInd < 2 else -1
+            nextArr, distArr = self.nextCell[headInd], self.wallDist[headInd]
+            for line in self.lines[axis]:
+                lineLen = len(line)
+                for pos, cell in enumerate(line):
+                    nextArr[cell] = line[(pos + step) % lineLen]
+
+                wallPos = next((pos for pos, cell in enumerate(line) if isWall[cell]), None)
+                if wallPos is None:
+                    continue
+
+                # walk backwards from a wall so each successor is already known
+                for backStep in range(1, lineLen):
+                    cell = line[(wallPos - backStep * step) % lineLen]
+                    nextC = nextArr[cell]
+                    distArr[cell] = 0 if isWall[nextC] else distArr[nextC] + 1
+
+    def _addLine(self, axis: int, line: list[int]) -> None:
+        lineInd = len(self.lines[axis])
+        self.lines[axis].append(line)
+        for pos, cell in enumerate(line):
+            self.lineOf[axis][cell] = lineInd
+            self.posIn[axis][cell] = pos
+
+    def moveInDirection(self, cell: int, headInd: int, numMoves: int) -> int:
+        maxMoves = self.wallDist[headInd][cell]
+        numMoves = numMoves if maxMoves == self.NO_WALL else min(numMoves, maxMoves)
+
+        axis, step = headInd % 2, 1 if headInd < 2 else -1
+        line = self.lines[axis][self.lineOf[axis][cell]]
+        return line[(self.posIn[axis][cell] + step * numMoves) % len(line)]
+
+    def traverseMazeUsingInput(self, inputs: list[str]) -> tuple[int, int, tuple[int, int]]:
+        curCell = self.startCell
+        curHeadInd = 0
+
+        for cmdIn in inputs:
+            match cmdIn:
+                case 'R':
+                    curHeadInd = (curHeadInd + 1) % len(self.HEADINGS)
+                case 'L':
+                    curHeadInd = (curHeadInd - 1) % len(self.HEADINGS)
+                case _:
+                    curCell = self.moveInDirection(curCell, curHeadInd, int(cmdIn))
+
+        return curCell // self.width, curCell % self.width, self.HEADINGS[curHeadInd]
+
 ###############################################################
 #   Soln for P2 of Day 22 for AoC
 #
 # Problem:
-#     Force the input to correspond to a specific mesh given
-#     rotations and then figure out the face correspondences.
-#     It does seem like adjacent faces formed by a L shape are
-#     guaranteed to be connected and then the leftover connections
-#     were implicit (either from a 4-group present or 2-group outer
-#     connection).
-#     This way was much hackier than should have been needed for this.
+#     The map is now the net of a cube, so walking off a face
+#     continues on whichever face shares that edge once folded.
+#
+# Observation:
+#     Rather than rotating faces into a known net, the net can be
+#     folded directly. Walking the net adjacency once assigns every
+#     face a 3D orientation (its normal along with where its local
+#     right and down point). Two faces share an edge when one's
+#     outward edge vector is the other's normal, which gives a
+#     portal table of (face, edge) -> (face, edge, flip) for any of
+#     the 11 cube nets and any face size. Walking never transforms
+#     the map, so the final position and heading are already in
+#     map coordinates.
 ###############################################################
-from functools import lru_cache
-import numpy as np
+from collections import deque
+from math import isqrt
 
 class TDSurfaceWalker:
     def __init__(self, inFile: str):
-        inNet, self.cellWidth = self.parseInitialNetMetadata(inFile)
-        adjPlan = self.generateNetAdjustPlan(inNet)
-        self.dataMat, self.indMat, self.oStr = self.parseArrays(inFile)
-
-        # We can transform the matrices now according to the discovered plan
-        # and fix an orientation for convenience
-        for tup in list(self.indMat[0,:]):
-            if tup == 0:
-                continue
-            self.sPoint = tup
-            break
-        self.sDir = Facing.RIGHT
-        self.adjNet = self.transformArrays(self.dataMat, self.indMat, adjPlan, inNet)
-        self.rotated = self.adjustMatricesAndStart()
+        self.mapRows, self.cellWidth = self.parseMap(inFile)
+
+        # faces are numbered in reading order, so face 0 holds the start
+        faceAt = dict()
+        self.faceOrigins = list()
+        for netRow in range(len(self.mapRows) // self.cellWidth):
+            rowStr = self.mapRows[netRow * self.cellWidth]
+            for netCol in range(len(rowStr) // self.cellWidth):
+                if rowStr[netCol * self.cellWidth] != ' ':
+                    faceAt[(netRow, netCol)] = len(self.faceOrigins)
+                    self.faceOrigins.append((netRow * self.cellWidth, netCol * self.cellWidth))
+
+        self.portals = self.stitchCube(faceAt)
+        self.sPoint = (0, (0, 0))
+        self.sDir = 0
 
     def traverseMazeUsingInput(self, inputs: list[str]) -> tuple[int, int, tuple[int, int]]:
-        curPos = self.sPoint
-        curFacing = self.sDir
+        curFace, curPos = self.sPoint
+        curHeadInd = self.sDir
 
         for cmdIn in inputs:
             match cmdIn:
                 case 'R':
-                    curFacing = Facing.turnRight(curFacing)
+                    curHeadInd = (curHeadInd + 1) % len(Facing.HEADINGS)
                 case 'L':
-                    curFacing = Facing.turnLeft(curFacing)
+                    curHeadInd = (curHeadInd - 1) % len(Facing.HEADINGS)
                 case _:
-                    curPos, curFacing = self.moveInDirection(curPos, curFacing, int(cmdIn))
-
-        # Before returning, convert back to absolute directions
-        for _ in range(self.adjNet[curPos[0]//self.cellWidth][curPos[1]//self.cellWidth]):
-            curFacing = Facing.turnLeft(curFacing)
-        if self.rotated:
-            curFacing = Facing.turnRight(curFacing)
-        curPos = self.indMat[curPos]
-
-        return curPos[0], curPos[1], curFacing
+                    curFace, curPos, curHeadInd = self.moveInDirection(curFace, curPos, curHeadInd, int(cmdIn))
 
-    def moveInDirection(self, sPos: tuple[int, int], sHeading: tuple[int, int], numMoves: int) -> tuple[tuple[int, int], tuple[int, int]]:
-        tupAdder = lambda tupL, tupR: (tupL[0] + tupR[0], tupL[1] + tupR[1])
-        validPos = lambda x, y: 0 <= x < self.dataMat.shape[0] and 0 <= y < self.dataMat.shape[1]
+        faceRow, faceCol = self.faceOrigins[curFace]
+        return faceRow + curPos[0], faceCol + curPos[1], Facing.HEADINGS[curHeadInd]
 
-        curPos = sPos
-        curHeading = sHeading
+    def moveInDirection(self, sFace: int, sPos: tuple[int, int], sHeadInd: int, numMoves: int) -> tuple[int, tuple[int, int], int]:
+        curFace, curPos, curHeadInd = sFace, sPos, sHeadInd
         for _ in range(numMoves):
-            newPos = tupAdder(curPos, curHeading)
-
-            if validPos(*newPos) and self.dataMat[newPos] == MazeElements.EMPTY:
-                curPos = newPos
-            elif validPos(*newPos) and self.dataMat[newPos] == MazeElements.WALL:
-                return curPos, curHeading
-            else: # wrap-around logic must occur here
-                curInvalidBlock = (newPos[0]//self.cellWidth, newPos[1]//self.cellWidth)
-                match curInvalidBlock:
-                    case (-1, 1) | (4, 1):  # wrap around with no directional change
-                        newHeading = curHeading
-                        newPos = (newPos[0]%self.dataMat.shape[0], newPos[1])
-                    case (1, -1) | (3, 0) | (1, 3) | (3, 2): # 180 deg turn case
-                        newHeading = Facing.turnRight(Facing.turnRight(curHeading))
-                        newPos = self.findNewPosHeading180(curPos, curInvalidBlock)
-                    case _: # 90 deg turns
-                        newPos, newHeading = self.findNewPosHeading90(curPos, curHeading, curInvalidBlock)
-
-                # after we still have to check what we might have come accross
-                if self.dataMat[newPos] == MazeElements.EMPTY:
-                    curPos, curHeading = newPos, newHeading
-                else:
-                    return curPos, curHeading
-        return curPos, curHeading
-
-    def findNewPosHeading180(self, bPos: tuple[int, int], invBlock: tuple[int, int]) -> tuple[int ,int]:
-        curValidBlock = (bPos[0]//self.cellWidth, bPos[1]//self.cellWidth)
-        keyVal = (curValidBlock, invBlock)
-
-        match keyVal:
-            case ((1,0), (1, -1)) | ((1, 2), (1, 3)):
-                moveVal = bPos[0] % self.cellWidth
-                newPos = (bPos[0] + 3*self.cellWidth - 2*moveVal - 1, bPos[1] + (curValidBlock[1]-invBlock[1])*self.cellWidth)
-            case ((3, 1), (3, 0)) | ((3, 1), (3, 2)):
-                moveVal = bPos[0] % self.cellWidth
-                newPos = (bPos[0] - self.cellWidth - 2*moveVal - 1, bPos[1] + (curValidBlock[1]-invBlock[1])*-1*self.cellWidth)
-            case _:
-                raise RuntimeError("Invalid scenario was passed into function")
-
-        return newPos
-
-    def findNewPosHeading90(self, bPos: tuple[int, int], bHeading: tuple[int, int], invBlock: tuple[int, int]) -> tuple[tuple[int, int], tuple[int, int]]:
-        curValidBlock = (bPos[0]//self.cellWidth, bPos[1]//self.cellWidth)
-        keyVal = (curValidBlock, invBlock)
-
-        match keyVal:
-            case ((1, 2), (0, 2)): # up and left
-                moveVal = bPos[1] % self.cellWidth + 1
-                newPos = (bPos[0] - moveVal, bPos[1] - moveVal)
-                newHeading = Facing.turnLeft(bHeading)
-            case ((0, 1), (0, 2)): # down and right
-                moveVal = self.cellWidth - bPos[0]
-                newPos = (bPos[0] + moveVal, bPos[1] + moveVal)
-                newHeading = Facing.turnRight(bHeading)
-            case ((1, 0), (0, 0)): # up and right
-                moveVal = self.cellWidth - bPos[1]
-                newPos = (bPos[0] - moveVal, bPos[1] + moveVal)
-                newHeading = Facing.turnRight(bHeading)
-            case ((0, 1), (0, 0)): # down and left
-                moveVal = self.cellWidth - bPos[0]
-                newPos = (bPos[0] + moveVal, bPos[1] - moveVal)
-                newHeading = Facing.turnLeft(bHeading)
-            case ((1, 0), (2, 0)): # down and right
-                moveVal = self.cellWidth - bPos[1]
-                newPos = (bPos[0] + moveVal, bPos[1] + moveVal)
-                newHeading = Facing.turnLeft(bHeading)
-            case ((2, 1), (2, 0)): # up and left
-                moveVal = bPos[0] % self.cellWidth + 1
-                newPos = (bPos[0] - moveVal, bPos[1] - moveVal)
-                newHeading = Facing.turnRight(bHeading)
-            case ((2, 1), (2, 2)): # up and right
-                moveVal = bPos[0] % self.cellWidth + 1
-                newPos = (bPos[0] - moveVal, bPos[1] + moveVal)
-                newHeading = Facing.turnLeft(bHeading)
-            case ((1, 2), (2, 2)): # down and left
-                moveVal = bPos[1] % self.cellWidth + 1
-                newPos = (bPos[0] + moveVal, bPos[1] - moveVal)
-                newHeading = Facing.turnRight(bHeading)
-            case _:
-                raise RuntimeError("Invalid scenario was passed into function")
-                
-        return newPos, newHeading
-
-    # Completely overwrites all relevant matrices to have proper vertical positioning
-    def adjustMatricesAndStart(self) -> bool:
-        if self.dataMat.shape[1] > self.dataMat.shape[0]:
-            self.sDir = Facing.turnLeft(self.sDir)
-            self.dataMat = np.rot90(self.dataMat)
-            self.indMat = np.rot90(self.indMat)
-
-            # since net is list of lists, manually rotate
-            finNet = list()
-            for colInd in range(len(self.adjNet[0])):
-                tempCol = list()
-                for rowInd in range(len(self.adjNet)):
-                    tempCol.append(self.adjNet[rowInd][colInd])
-                finNet.append(tempCol)
-            finNet.reverse()
-            self.adjNet = finNet
-
-            # Find new starting point
-            for xVal in range(self.indMat.shape[0]):
-                for yVal in range(self.indMat.shape[1]):
-                    if self.indMat[xVal, yVal] == self.sPoint:
-                        self.sPoint = (xVal, yVal)
-                        return True
-
-        return False
-
-    def transformArrays(self, datMat: np.ndarray, indMat: np.ndarray, adjPlan: list[tuple[tuple, tuple]], inNet: tuple[tuple[int]]) -> list[list[int]]:
-        # readjusts net for calculating final heading rotation
-        finNet = list([list(row) for row in inNet])
-        for rowVal in range(len(inNet)):
-            for colVal in range(len(inNet[0])):
-                finNet[rowVal][colVal] -= 1
-
-        # Determines a CW or CCW movement w.r.t a center point of (1,1) on the grid
-        isCW = lambda initPos, finalPos: ((initPos[1]-1)*(finalPos[0]-1) - (initPos[0]-1)*(finalPos[1]-1)) > 0
-
-        for swappedBlockPos in adjPlan:
-            onePos, zPos = swappedBlockPos
-            if isCW(onePos, zPos):
-                rotatedDatMat = np.rot90(datMat[onePos[0]*self.cellWidth:(onePos[0]+1)*self.cellWidth, onePos[1]*self.cellWidth:(onePos[1]+1)*self.cellWidth], -1)
-                rotatedIndMat = np.rot90(indMat[onePos[0]*self.cellWidth:(onePos[0]+1)*self.cellWidth, onePos[1]*self.cellWidth:(onePos[1]+1)*self.cellWidth], -1)
-                adjDel = 1
-            else:
-                rotatedDatMat = np.rot90(datMat[onePos[0]*self.cellWidth:(onePos[0]+1)*self.cellWidth, onePos[1]*self.cellWidth:(onePos[1]+1)*self.cellWidth])
-                rotatedIndMat = np.rot90(indMat[onePos[0]*self.cellWidth:(onePos[0]+1)*self.cellWidth, onePos[1]*self.cellWidth:(onePos[1]+1)*self.cellWidth])
-                adjDel = 3
-            datMat[zPos[0]*self.cellWidth:(zPos[0]+1)*self.cellWidth, zPos[1]*self.cellWidth:(zPos[1]+1)*self.cellWidth] = rotatedDatMat
-            datMat[onePos[0]*self.cellWidth:(onePos[0]+1)*self.cellWidth, onePos[1]*self.cellWidth:(onePos[1]+1)*self.cellWidth] = ' '
-            indMat[zPos[0]*self.cellWidth:(zPos[0]+1)*self.cellWidth, zPos[1]*self.cellWidth:(zPos[1]+1)*self.cellWidth] = rotatedIndMat
-            indMat[onePos[0]*self.cellWidth:(onePos[0]+1)*self.cellWidth, onePos[1]*self.cellWidth:(onePos[1]+1)*self.cellWidth] = 0
-            finNet[onePos[0]][onePos[1]], finNet[zPos[0]][zPos[1]] = finNet[zPos[0]][zPos[1]], finNet[onePos[0]][onePos[1]] + adjDel
-
-        return finNet
-
-    def parseArrays(self, inFile: str) -> tuple[np.ndarray, np.ndarray, list[str]]:
-        # Data arr
-        mat = list()
-        with open(inFile, 'r') as inArr:
-            origStr = inArr.read().split("\n\n")[0].split("\n")
-            mat = [line.rstrip() for line in origStr]
-        maxW = max([len(line) for line in mat])
-        mat = np.array([list(line + " "*(maxW-len(line))) for line in mat], dtype=str)
-
-        # Index arr (for solution)
-        indArr = np.array([[(rowInd, colInd) for colInd in range(mat.shape[1])] for rowInd in range(mat.shape[0])], dtype="i,i").astype(np.object_)
-        indArr = np.where(mat == " ", 0, indArr)
-
-        return mat, indArr, origStr
-
-
-    # generates a plan that corresponds to the change needed to modify
-    # a net into becoming the default net
-    # TODO: Adjust this to apply to any type of net orientation. Maybe rotate? Would need
-    #       to take into account specific net structures
-    def generateNetAdjustPlan(self, inNet: tuple[tuple[int]]) -> list[tuple[tuple, tuple]]:
-        # this is hardcoded for this special type of net
-        DEFAULT_NET = ((0, 0, 1, 0), (1, 1, 1, 1), (0, 0, 1, 0)) if len(inNet[0]) > len(inNet) else \
-                      ((0, 1, 0), (1, 1, 1), (0, 1, 0), (0, 1, 0))
-
-        sol = [((-1, -1), (-1, -1))] * 1000
-        cache = dict()
-        startNet = [list(row) for row in inNet]
-        self.recursivelySearchSwaps(startNet, cache, [], sol, tuple((tuple(row) for row in DEFAULT_NET)))
-        return sol
-    
-    ############################# HELPER FUNCS ########################################
-    @lru_cache
-    def enumerateNearbyCoords(self, curPos: tuple[int, int], netRows: int, netCols: int) -> list[tuple[int, int]]:
-        posDels = [(0, -1), (0, 1), (1, 0), (-1, 0)]
-        isValidCoord = lambda rInd, cInd: 0 <= rInd < netRows and 0 <= cInd < netCols
-        tupAdder = lambda tupL, tupR: (tupL[0]+tupR[0], tupL[1]+tupR[1])
-        
-        tReturn = list()
-        for delta in posDels:
-            newPos = tupAdder(curPos, delta)
-            if isValidCoord(*newPos):
-                tReturn.append(newPos)
-        
-        return tReturn
-
-    def recursivelySearchSwaps(self, curNet: list[list[int]], netCache: dict[tuple[tuple[int]], int], curAdjs: list[tuple[tuple, tuple]], solAdjs: list[tuple[tuple, tuple]], tNet: tuple[tuple[int]], maxDepth: int = 7) -> None:
-        tupCurNet = tuple((tuple(row) for row in curNet))
-        if tupCurNet == tNet:                                              # potential solution found
-            if len(curAdjs) <= len(solAdjs):
-                solAdjs.clear()
-                solAdjs.extend(curAdjs)
-            return
-        elif len(curAdjs) > maxDepth:
-            return
-        elif tupCurNet in netCache and netCache[tupCurNet] <= len(curAdjs): # prune node visited earlier
-            return
-
-        # record visit
-        netCache[tupCurNet] = len(curAdjs)
-
-        # continue swapping where possible
-        for rowInd in range(len(curNet)):
-            for colInd in range(len(curNet[0])):
-                if curNet[rowInd][colInd] == 0:
+            newFace, newPos, newHeadInd = self.stepOnce(curFace, curPos, curHeadInd)
+            faceRow, faceCol = self.faceOrigins[newFace]
+            if self.mapRows[faceRow + newPos[0]][faceCol + newPos[1]] == MazeElements.WALL:
+                break
+            curFace, curPos, curHeadInd = newFace, newPos, newHeadInd
+
+        return curFace, curPos, curHeadInd
+
+    def stepOnce(self, face: int, pos: tuple[int, int], headInd: int) -> tuple[int, tuple[int, int], int]:
+        newRow, newCol = pos[0] + Facing.HEADINGS[headInd][0], pos[1] + Facing.HEADINGS[headInd][1]
+        if 0 <= newRow < self.cellWidth and 0 <= newCol < self.cellWidth:
+            return face, (newRow, newCol), headInd
+
+        # crossing an edge: keep the offset along it and enter heading inwards
+        alongInd = pos[0] if headInd % 2 == 0 else pos[1]
+        newFace, newEdge, isFlipped = self.portals[(face, headInd)]
+        if isFlipped:
+            alongInd = self.cellWidth - 1 - alongInd
+
+        lastInd = self.cellWidth - 1
+        match newEdge:
+            case 0:
+                newPos = (alongInd, lastInd)
+            case 1:
+                newPos = (lastInd, alongInd)
+            case 2:
+                newPos = (alongInd, 0)
+            case 3:
+                newPos = (0, alongInd)
+
+        return newFace, newPos, (newEdge + 2) % len(Facing.HEADINGS)
+
+    # Folds the net face by face and matches every edge against the
+    # face it ends up touching. Edges are indexed like Facing.HEADINGS.
+    @staticmethod
+    def stitchCube(faceAt: dict[tuple[int, int], int]) -> dict[tuple[int, int], tuple[int, int, bool]]:
+        neg = lambda vec: tuple(-val for val in vec)
+
+        # orientation holds (normal, local right, local down) as 3D vectors
+        firstPos = min(faceAt)
+        orientation = {faceAt[firstPos]: ((0, 0, 1), (1, 0, 0), (0, 1, 0))}
+        toFold = deque([firstPos])
+        while toFold:
+            curPos = toFold.popleft()
+            normal, right, down = orientation[faceAt[curPos]]
+            for headInd, (dRow, dCol) in enumerate(Facing.HEADINGS):
+                nextPos = (curPos[0] + dRow, curPos[1] + dCol)
+                if nextPos not in faceAt or faceAt[nextPos] in orientation:
                     continue
 
-                for sPos in self.enumerateNearbyCoords((rowInd, colInd), len(curNet), len(curNet[0])):
-                    if curNet[sPos[0]][sPos[1]] == 0:
-                        curNet[rowInd][colInd], curNet[sPos[0]][sPos[1]] = curNet[sPos[0]][sPos[1]], curNet[rowInd][colInd]
-                        self.recursivelySearchSwaps(curNet, netCache, curAdjs + [((rowInd, colInd), (sPos[0], sPos[1]))], solAdjs, tNet)
-                        curNet[rowInd][colInd], curNet[sPos[0]][sPos[1]] = curNet[sPos[0]][sPos[1]], curNet[rowInd][colInd]
+                match headInd:
+                    case 0:
+                        orientation[faceAt[nextPos]] = (right, neg(normal), down)
+                    case 1:
+                        orientation[faceAt[nextPos]] = (down, right, neg(normal))
+                    case 2:
+                        orientation[faceAt[nextPos]] = (neg(right), normal, down)
+                    case 3:
+                        orientation[faceAt[nextPos]] = (neg(down), right, normal)
+                toFold.append(nextPos)
+
+        if len(orientation) != 6 or len({normal for normal, _, _ in orientation.values()}) != 6:
+            raise ValueError("Map does not describe a cube net")
+
+        # outward vector of each edge and the direction its offset runs along
+        def outwardOf(face: int, edge: int) -> tuple[int, int, int]:
+            _, right, down = orientation[face]
+            return (right, down, neg(right), neg(down))[edge]
+        alongOf = lambda face, edge: orientation[face][2] if edge % 2 == 0 else orientation[face][1]
+        faceOfNormal = {normal: face for face, (normal, _, _) in orientation.items()}
+
+        portals = dict()
+        for face, (normal, _, _) in orientation.items():
+            for edge in range(len(Facing.HEADINGS)):
+                newFace = faceOfNormal[outwardOf(face, edge)]
+                newEdge = next(cand for cand in range(len(Facing.HEADINGS)) if outwardOf(newFace, cand) == normal)
+                portals[(face, edge)] = (newFace, newEdge, alongOf(face, edge) != alongOf(newFace, newEdge))
+
+        return portals
 
     @staticmethod
-    def parseInitialNetMetadata(inFile: str) -> tuple[tuple[tuple[int]], int]:
-        # first extract block sizes
-        # 3-3 net can mess this up, accounting for it can be done
-        # by finding the GCD between col size and min row len
-        with open(inFile, 'r') as initBlock:
-            curLine = initBlock.readline().rstrip()
-            numLines = 0
-            minLen = 100000
-            while curLine.strip():
-                minLen = min(len(curLine.lstrip()), minLen)
-                numLines += 1
-                curLine = initBlock.readline().rstrip()
-        
-        # now parse the NxN blocks
-        netStructure = list()
-        with open(inFile, 'r') as initBlock:
-            curLine = initBlock.readline().rstrip()
-            while curLine:
-                rowLen = len(curLine.lstrip())
-                rowOffset = (len(curLine) - rowLen) // minLen
-                curRow = [0] * rowOffset + [1] * (rowLen // minLen)
-                netStructure.append(curRow)
-
-                for _ in range(minLen):
-                    curLine = initBlock.readline().rstrip()
-
-        # pad final output for consistent sizing
-        maxLen = max([len(row) for row in netStructure])
-        [row.extend([0]*(maxLen-len(row))) for row in netStructure]
+    def parseMap(inFile: str) -> tuple[list[str], int]:
+        with open(inFile, 'r') as inArr:
+            mapRows = [line.rstrip() for line in inArr.read().split("\n\n")[0].split("\n")]
 
-        return tuple((tuple(row) for row in netStructure)), minLen
+        # six equal faces make up every non-blank cell
+        maxW = max([len(line) for line in mapRows])
+        numCells = sum([len(line.strip()) for line in mapRows])
+        return [line.ljust(maxW) for line in mapRows], isqrt(numCells // 6)
 
     @staticmethod
     def extractFileCommands(inFile: str) -> list[str]:
@@ -451,7 +385,7 @@ if __name__ == "__main__":
     # prepare env for p1
     inFile = './2022/Day22/input'
     wMap, rDict, cDict, cList = parseInput(inFile)
-    solCoords = traverseMazeUsingInput(cList, wMap, rDict, cDict)
+    solCoords = FlatMapJumper(wMap, rDict, cDict).traverseMazeUsingInput(cList)
     print("Solution to part 1 is {}".format(Facing.calculateAnswer(*solCoords)))
 
     # now eval on p2
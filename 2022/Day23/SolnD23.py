@@ -7,11 +7,30 @@
 #     means that functors along with a modulus should make things
 #     function quickly here.
 #     Part 2 is just running until the simulation stalls.
+#
+# Observation:
+#     The per-elf rules hash a handful of fresh tuples for
+#     every elf on every round. The "numpy" backend instead keeps
+#     the elves in a padded boolean grid, so each neighbor check
+#     becomes a shifted copy of the whole grid and the proposals
+#     and collisions are resolved with masks all at once. The
+#     pure-Python "bits" backend does the same with one big int per
+#     row, where every rule is a shifted OR of the adjacent rows.
+#     Late in part 2 most elves are settled, so the "frontier"
+#     backend only re-evaluates elves whose surroundings changed
+#     during the last round and keeps the bounds up to date with
+#     per-row and per-column counts.
 ###############################################################
-from collections import defaultdict
+from collections import defaultdict, Counter
+import numpy as np
 
 class ElfAutomata():
-    def __init__(self, initialStateFile: str):
+    BACKENDS = ("sets", "numpy", "bits", "frontier")
+
+    def __init__(self, initialStateFile: str, * , backend: str = "sets"):
+        if backend not in self.BACKENDS:
+            raise ValueError("Unknown backend '{}', expected one of {}".format(backend, self.BACKENDS))
+        self.backend = backend
         self.ruleOffset = -1
         self.curRound = 0
         self.xMin, self.xMax = 100000, 0
@@ -37,12 +56,32 @@ class ElfAutomata():
                                                               (curX-1, curY+1) in self.elfPosVals)) == 0 else None
         self.atomRules = [NMoveLam, SMoveLam, WMoveLam, EMoveLam]
 
+        if self.backend == "numpy":
+            self.elfGrid, self.gridOrigin = self.buildGrid()
+        elif self.backend == "bits":
+            self.elfRows, self.rowsOrigin = self.buildRows()
+        elif self.backend == "frontier":
+            self.dirtyElves = set(self.elfPosVals)
+            self.rowCounts = Counter([pos[0] for pos in self.elfPosVals])
+            self.colCounts = Counter([pos[1] for pos in self.elfPosVals])
+
     """
         Simulates the automata for a given number of rounds. If the runUntilStall flag is
         passed as True, then the number of rounds is ignored and the program simply runs until
         no movements are made and returns the round number when nothing moves.
     """
     def simulate(self, * , numRounds: int = 1, runUntilStall: bool = False) -> int:
+        match self.backend:
+            case "numpy":
+                return self.simulateGrid(numRounds = numRounds, runUntilStall = runUntilStall)
+            case "bits":
+                return self.simulateRows(numRounds = numRounds, runUntilStall = runUntilStall)
+            case "frontier":
+                return self.simulateFrontier(numRounds = numRounds, runUntilStall = runUntilStall)
+            case _:
+                return self.simulateSets(numRounds = numRounds, runUntilStall = runUntilStall)
+
+    def simulateSets(self, * , numRounds: int = 1, runUntilStall: bool = False) -> int:
         simRoundCount = 0
 
         while simRoundCount < numRounds or runUntilStall:
@@ -82,6 +121,259 @@ class ElfAutomata():
         self.updateLimits() # update limits after rounds are done
         return -1
 
+    ############################# GRID BACKEND ########################################
+    # (row, col) deltas for the rule order used by atomRules (N, S, W, E)
+    RULE_DELTAS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+    def simulateGrid(self, * , numRounds: int = 1, runUntilStall: bool = False) -> int:
+        simRoundCount = 0
+
+        while simRoundCount < numRounds or runUntilStall:
+            self.ruleOffset = (self.ruleOffset + 1)%len(self.atomRules)
+            self.curRound += 1
+            simRoundCount += 1
+            self.growGridIfNeeded()
+
+            # out[r, c] = grid[r + dR, c + dC], safe to roll since the border is empty
+            grid = self.elfGrid
+            shifted = lambda arr, dR, dC: np.roll(arr, (-dR, -dC), axis = (0, 1))
+            nbrs = {(dR, dC): shifted(grid, dR, dC) for dR in (-1, 0, 1) for dC in (-1, 0, 1) if dR or dC}
+            sideFree = (~(nbrs[(-1, -1)] | nbrs[(-1, 0)] | nbrs[(-1, 1)]),
+                        ~(nbrs[(1, -1)] | nbrs[(1, 0)] | nbrs[(1, 1)]),
+                        ~(nbrs[(-1, -1)] | nbrs[(0, -1)] | nbrs[(1, -1)]),
+                        ~(nbrs[(-1, 1)] | nbrs[(0, 1)] | nbrs[(1, 1)]))
+
+            # elves with nobody around stay put, the rest take the first free side
+            undecided = grid & ~(sideFree[0] & sideFree[1] & sideFree[2] & sideFree[3])
+            proposals = [None] * len(self.RULE_DELTAS)
+            for ruleStep in range(len(self.RULE_DELTAS)):
+                ruleInd = (self.ruleOffset + ruleStep)%len(self.RULE_DELTAS)
+                proposals[ruleInd] = undecided & sideFree[ruleInd]
+                undecided &= ~proposals[ruleInd]
+
+            if not any(proposal.any() for proposal in proposals): # no movements made
+                self.syncFromGrid()
+                return self.curRound
+
+            # count proposals per target cell and only let unique targets through
+            targetCounts = np.zeros(grid.shape, dtype = np.uint8)
+            for ruleInd, (dR, dC) in enumerate(self.RULE_DELTAS):
+                targetCounts += shifted(proposals[ruleInd], -dR, -dC)
+            uniqueTargets = targetCounts == 1
+
+            newGrid = grid.copy()
+            for ruleInd, (dR, dC) in enumerate(self.RULE_DELTAS):
+                movers = proposals[ruleInd] & shifted(uniqueTargets, dR, dC)
+                newGrid &= ~movers
+                newGrid |= shifted(movers, -dR, -dC)
+            self.elfGrid = newGrid
+
+        self.syncFromGrid()
+        self.updateLimits() # update limits after rounds are done
+        return -1
+
+    def buildGrid(self, pad: int = 2) -> tuple[np.ndarray, tuple[int, int]]:
+        grid = np.zeros((self.xMax - self.xMin + 1 + 2*pad, self.yMax - self.yMin + 1 + 2*pad), dtype = bool)
+        origin = (self.xMin - pad, self.yMin - pad)
+        for xVal, yVal in self.elfPosVals:
+            grid[xVal - origin[0], yVal - origin[1]] = True
+
+        return grid, origin
+
+    # Keeps an empty one-cell border around the elves so shifted copies never wrap an elf
+    def growGridIfNeeded(self) -> None:
+        grid = self.elfGrid
+        if not (grid[0, :].any() or grid[-1, :].any() or grid[:, 0].any() or grid[:, -1].any()):
+            return
+
+        pad = max(2, max(grid.shape)//4)
+        self.elfGrid = np.pad(grid, pad)
+        self.gridOrigin = (self.gridOrigin[0] - pad, self.gridOrigin[1] - pad)
+
+    def syncFromGrid(self) -> None:
+        rowInds, colInds = np.nonzero(self.elfGrid)
+        self.elfPosVals = set(zip((rowInds + self.gridOrigin[0]).tolist(), (colInds + self.gridOrigin[1]).tolist()))
+
+    ############################# BITS BACKEND ########################################
+    # Bit j of elfRows[i] is the elf at (rowsOrigin[0] + i, rowsOrigin[1] + j), so
+    # moving west is a right shift and moving east is a left shift.
+    def simulateRows(self, * , numRounds: int = 1, runUntilStall: bool = False) -> int:
+        simRoundCount = 0
+
+        while simRoundCount < numRounds or runUntilStall:
+            self.ruleOffset = (self.ruleOffset + 1)%len(self.atomRules)
+            self.curRound += 1
+            simRoundCount += 1
+            self.growRowsIfNeeded()
+
+            # proposals per row for each rule in atomRules order (N, S, W, E)
+            rows = self.elfRows
+            numRows = len(rows)
+            proposals = [[0] * numRows for _ in range(len(self.atomRules))]
+            anyProposal = False
+            for rowInd in range(1, numRows - 1):
+                curRow = rows[rowInd]
+                if not curRow:
+                    continue
+                upRow, downRow = rows[rowInd - 1], rows[rowInd + 1]
+                colUnion = upRow | curRow | downRow
+                sideTaken = (upRow | (upRow << 1) | (upRow >> 1),
+                             downRow | (downRow << 1) | (downRow >> 1),
+                             colUnion << 1,
+                             colUnion >> 1)
+
+                crowded = curRow & (sideTaken[0] | sideTaken[1] | sideTaken[2] | sideTaken[3])
+                undecided = crowded
+                for ruleStep in range(len(self.atomRules)):
+                    ruleInd = (self.ruleOffset + ruleStep)%len(self.atomRules)
+                    proposals[ruleInd][rowInd] = undecided & ~sideTaken[ruleInd]
+                    undecided &= sideTaken[ruleInd]
+                anyProposal = anyProposal or undecided != crowded
+
+            if not anyProposal: # no movements made
+                self.syncFromRows()
+                return self.curRound
+
+            # a target is blocked as soon as two proposals land on it
+            nProps, sProps, wProps, eProps = proposals
+            blocked = [0] * numRows
+            for rowInd in range(1, numRows - 1):
+                targets = (nProps[rowInd + 1], sProps[rowInd - 1], wProps[rowInd] >> 1, eProps[rowInd] << 1)
+                seen = 0
+                for target in targets:
+                    blocked[rowInd] |= seen & target
+                    seen |= target
+
+            newRows = list(rows)
+            for rowInd in range(1, numRows - 1):
+                nMoves = nProps[rowInd] & ~blocked[rowInd - 1]
+                sMoves = sProps[rowInd] & ~blocked[rowInd + 1]
+                wMoves = wProps[rowInd] & ~(blocked[rowInd] << 1)
+                eMoves = eProps[rowInd] & ~(blocked[rowInd] >> 1)
+                newRows[rowInd] &= ~(nMoves | sMoves | wMoves | eMoves)
+                newRows[rowInd - 1] |= nMoves
+                newRows[rowInd + 1] |= sMoves
+                newRows[rowInd] |= (wMoves >> 1) | (eMoves << 1)
+            self.elfRows = newRows
+
+        self.syncFromRows()
+        self.updateLimits() # update limits after rounds are done
+        return -1
+
+    def buildRows(self, pad: int = 2) -> tuple[list[int], tuple[int, int]]:
+        rows = [0] * (self.xMax - self.xMin + 1 + 2*pad)
+        origin = (self.xMin - pad, self.yMin - pad)
+        for xVal, yVal in self.elfPosVals:
+            rows[xVal - origin[0]] |= 1 << (yVal - origin[1])
+
+        return rows, origin
+
+    # Keeps an empty row above and below and an empty bit 0 so no elf is shifted away
+    def growRowsIfNeeded(self, pad: int = 2) -> None:
+        if self.elfRows[0]:
+            self.elfRows[:0] = [0] * pad
+            self.rowsOrigin = (self.rowsOrigin[0] - pad, self.rowsOrigin[1])
+        if self.elfRows[-1]:
+            self.elfRows.extend([0] * pad)
+        if any(row & 1 for row in self.elfRows):
+            self.elfRows = [row << pad for row in self.elfRows]
+            self.rowsOrigin = (self.rowsOrigin[0], self.rowsOrigin[1] - pad)
+
+    def syncFromRows(self) -> None:
+        self.elfPosVals = set()
+        for rowInd, curRow in enumerate(self.elfRows):
+            while curRow:
+                lowBit = curRow & -curRow
+                self.elfPosVals.add((self.rowsOrigin[0] + rowInd, self.rowsOrigin[1] + lowBit.bit_length() - 1))
+                curRow ^= lowBit
+
+    ########################### FRONTIER BACKEND ######################################
+    # An elf that stays put does so either because nobody is around or because every
+    # side is taken, neither of which depends on the rule order. Such an elf only has
+    # to be looked at again once something in its 3x3 neighborhood moves. Elves that
+    # collided did propose, so they stay on the frontier for the next round.
+    def simulateFrontier(self, * , numRounds: int = 1, runUntilStall: bool = False) -> int:
+        simRoundCount = 0
+
+        # the 3x3 blocks around both ends of a move overlap into one 3x4 block
+        blockDeltas = dict()
+        for mX, mY in self.RULE_DELTAS:
+            blockDeltas[(mX, mY)] = [(dX, dY) for dX in range(min(0, mX) - 1, max(0, mX) + 2)
+                                              for dY in range(min(0, mY) - 1, max(0, mY) + 2)]
+
+        while simRoundCount < numRounds or runUntilStall:
+            self.ruleOffset = (self.ruleOffset + 1)%len(self.atomRules)
+            self.curRound += 1
+            simRoundCount += 1
+
+            # same rules as atomRules, but each neighbour is looked up only once
+            # per elf instead of once per rule that reads it
+            ruleOrder = [(self.ruleOffset + curLamInd)%len(self.atomRules) for curLamInd in range(len(self.atomRules))]
+            elfPosVals = self.elfPosVals
+            afterBeforeDict = defaultdict(list)
+            for elfPos in self.dirtyElves:
+                curX, curY = elfPos
+                nW, nC, nE = (curX-1, curY-1) in elfPosVals, (curX-1, curY) in elfPosVals, (curX-1, curY+1) in elfPosVals
+                sW, sC, sE = (curX+1, curY-1) in elfPosVals, (curX+1, curY) in elfPosVals, (curX+1, curY+1) in elfPosVals
+                cW, cE = (curX, curY-1) in elfPosVals, (curX, curY+1) in elfPosVals
+                isBlocked = (nW or nC or nE, sW or sC or sE, nW or cW or sW, nE or cE or sE)
+                if not (isBlocked[0] or isBlocked[1] or cW or cE):
+                    continue
+
+                for ruleInd in ruleOrder:
+                    if not isBlocked[ruleInd]:
+                        mX, mY = self.RULE_DELTAS[ruleInd]
+                        afterBeforeDict[(curX + mX, curY + mY)].append(elfPos)
+                        break
+
+            if not afterBeforeDict: # no movements made
+                return self.curRound
+
+            # proposals are all known, so moves can be applied in place. Only
+            # occupied cells around a move are marked; an elf that moves later in
+            # this loop drops its old cell and marks its own block instead.
+            nextDirty = set()
+            for potMovedElf, movers in afterBeforeDict.items():
+                if len(movers) > 1:
+                    nextDirty.update(movers)
+                    continue
+                (oldX, oldY), (newX, newY) = movers[0], potMovedElf
+                elfPosVals.remove(movers[0])
+                elfPosVals.add(potMovedElf)
+                nextDirty.discard(movers[0])
+                self.trackMove(movers[0], potMovedElf)
+
+                for dX, dY in blockDeltas[(newX - oldX, newY - oldY)]:
+                    nearPos = (oldX + dX, oldY + dY)
+                    if nearPos in elfPosVals:
+                        nextDirty.add(nearPos)
+            self.dirtyElves = nextDirty
+
+        return -1
+
+    # Keeps the exact bounding box current using per-row/column elf counts
+    def trackMove(self, oldPos: tuple[int, int], newPos: tuple[int, int]) -> None:
+        oldX, oldY = oldPos
+        newX, newY = newPos
+        if oldX != newX:
+            self.rowCounts[oldX] -= 1
+            self.rowCounts[newX] += 1
+            self.xMin, self.xMax = min(self.xMin, newX), max(self.xMax, newX)
+            if not self.rowCounts[oldX]: # bounds can only shrink when a row empties
+                while not self.rowCounts[self.xMin]:
+                    self.xMin += 1
+                while not self.rowCounts[self.xMax]:
+                    self.xMax -= 1
+        else:
+            self.colCounts[oldY] -= 1
+            self.colCounts[newY] += 1
+            self.yMin, self.yMax = min(self.yMin, newY), max(self.yMax, newY)
+            if not self.colCounts[oldY]:
+                while not self.colCounts[self.yMin]:
+                    self.yMin += 1
+                while not self.colCounts[self.yMax]:
+                    self.yMax -= 1
+
     # Given the limits, simply calculates the number of empty spaces available in the area
     def calculatePart1Ans(self):
         return (self.yMax-self.yMin+1)*(self.xMax-self.xMin+1) - len(self.elfPosVals)
@@ -120,11 +412,11 @@ class ElfAutomata():
 if __name__ == "__main__":
     # Prepare env for p1
     inFile = "./2022/Day23/input"
-    eAutomata = ElfAutomata(inFile)
+    eAutomata = ElfAutomata(inFile, backend = "numpy")
     eAutomata.simulate(numRounds = 10)
     sol1 = eAutomata.calculatePart1Ans()
     print("The answer to part 1 is {}".format(sol1))
 
-    eAutomata = ElfAutomata(inFile)
+    eAutomata = ElfAutomata(inFile, backend = "numpy")
     sol2 = eAutomata.simulate(runUntilStall = True)
     print("The solution to part 2 is {}".format(sol2))
\ No newline at end of file
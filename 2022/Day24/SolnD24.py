@@ -12,6 +12,18 @@
 #    One thing to immediately notice is that there is a periodicity
 #    in the map, which can allow us to hard-code this map and use a
 #    traversal algorithm to pick the optimal path.
+#
+# Observation:
+#    Every time step only depends on the set of cells reachable
+#    at the previous step, so the search can also be done as a BFS
+#    over whole time layers. The reachable set is a boolean array
+#    that spreads with shifts and is masked by the blizzards at the
+#    next time step. Since each blizzard direction just rotates its
+#    own rows or columns, occupancy at any time is four rolls of the
+#    initial per-direction maps, so the time cube is never needed.
+#    The same idea gives an O(1) isBlocked(t, r, c) for single cells
+#    using one bitmask per row (horizontal blizzards) or per column
+#    (vertical blizzards), which A* uses in place of the cube.
 ####################################################################
 from functools import lru_cache
 from collections import defaultdict
@@ -29,11 +41,13 @@ class BlizzardCrossing:
         # Parse initial map state
         walls, blizzards = self.parseInputBlizzards(inFile)
         self.sPos, self.ePos = self.extrapolateStartEndPos(walls)
-        self.timeMap = self.generateAllMaps(walls, blizzards)
+        self.mapShape, self.period = self._extractMapMetadata(walls)
+        self.blizMaps = self.generateDirectionMaps(blizzards)
+        self.generateOccupancyMasks(blizzards)
 
         # helper lams
-        self.isValid = lambda timeInd, rowInd, colInd: (0 <= rowInd < self.timeMap.shape[1]) and (0 <= colInd < self.timeMap.shape[2]) and (0 <= timeInd < self.timeMap.shape[0])
-        self.tupAdder = lambda tupL, tupR:((tupL[0] + tupR[0])%self.timeMap.shape[0], tupL[1] + tupR[1], tupL[2] + tupR[2])
+        self.isValid = lambda timeInd, rowInd, colInd: (0 <= rowInd < self.mapShape[0]) and (0 <= colInd < self.mapShape[1])
+        self.tupAdder = lambda tupL, tupR:((tupL[0] + tupR[0])%self.period, tupL[1] + tupR[1], tupL[2] + tupR[2])
         self.heuristic = lambda pt1: abs(pt1[1]-self.ePos[0]) + abs(pt1[2]-self.ePos[1]) # time is not factored here as the exit exists at all times
 
     '''
@@ -58,7 +72,7 @@ class BlizzardCrossing:
             if curNode[1:] == endPos:
                 return len(self._generatePath(pastNodes, curNode)) - 1
             
-            posNodes = [node for node in self._generatePosMoves(curNode) if (self.isValid(*node) and self.timeMap[node] != self.CellElements.WALL)]
+            posNodes = [node for node in self._generatePosMoves(curNode, self.period) if (self.isValid(*node) and not self.isBlocked(*node))]
             for posNode in posNodes:
                 nextGN = gN[curNode] + 1
                 if nextGN < gN.get(posNode, 10000):
@@ -71,6 +85,154 @@ class BlizzardCrossing:
 
         return -1
     
+    '''
+        Same query as getMinTimeToGoal, but expands every reachable cell at once per time
+        step instead of popping single nodes. This is just a single leg trip.
+    '''
+    def getMinTimeBitset(self, * , custStart: Optional[tuple[int, int, int]] = None, custEnd: Optional[tuple[int, int]] = None) -> int:
+        startTime, *startPos = (0, *self.sPos) if custStart is None else custStart
+        endPos = self.ePos if custEnd is None else custEnd
+        return self.planTrip([tuple(startPos), endPos], startTime = startTime)[0]
+
+    '''
+        Finds the minimum time for each leg of a trip through the given waypoints. All legs
+        share one time-indexed search: layer k holds the cells reachable after finishing k
+        legs, and a layer standing on its next waypoint also feeds the following layer.
+        This keeps every arrival time (not only the earliest) alive for later legs and the
+        blizzards of each time step are only computed once. Legs that can never be finished
+        are reported as -1.
+    '''
+    def planTrip(self, waypoints: list[tuple[int, int]], * , startTime: int = 0) -> list[int]:
+        for rowInd, colInd in waypoints:
+            if self._gapIndex((rowInd, colInd)) < 0 and not (1 <= rowInd < self.mapShape[0] - 1 and 1 <= colInd < self.mapShape[1] - 1):
+                raise ValueError("Waypoint {} is not inside the valley".format((rowInd, colInd)))
+
+        numLegs = len(waypoints) - 1
+        layers = [self._emptyLayer() for _ in range(numLegs + 1)]
+        self._markLayer(layers[0], waypoints[0])
+        arrivals = [startTime]
+
+        curTime = startTime
+        snapshot = None
+        while True:
+            # cascade upwards so repeated waypoints finish in the same step
+            for legInd in range(numLegs):
+                if self._layerHas(layers[legInd], waypoints[legInd + 1]):
+                    self._markLayer(layers[legInd + 1], waypoints[legInd + 1])
+                    if len(arrivals) == legInd + 1:
+                        arrivals.append(curTime)
+            if len(arrivals) == numLegs + 1:
+                break
+
+            # blizzards repeat every period, so an unchanged state means no progress ever
+            if (curTime - startTime) % self.period == 0:
+                curState = [(layer[0].tobytes(), tuple(layer[1])) for layer in layers]
+                if curState == snapshot:
+                    break
+                snapshot = curState
+
+            curTime += 1
+            occupied = self.blizzardsAt(curTime)
+            layers = [self._stepLayer(layer, occupied) for layer in layers]
+
+        legTimes = [arrivals[legInd + 1] - arrivals[legInd] for legInd in range(len(arrivals) - 1)]
+        return legTimes + [-1] * (numLegs - len(legTimes))
+
+    ############### LAYER HELPERS ####################
+    # A layer is a boolean array over the blizzard area plus one flag for each of the
+    # entrance and exit gaps, since blizzards never reach those.
+    def _emptyLayer(self) -> tuple[np.ndarray, list[bool]]:
+        return np.zeros((self.mapShape[0] - 2, self.mapShape[1] - 2), dtype = bool), [False, False]
+
+    def _gapIndex(self, pos: tuple[int, int]) -> int:
+        return [self.sPos, self.ePos].index(pos) if pos in (self.sPos, self.ePos) else -1
+
+    def _markLayer(self, layer: tuple[np.ndarray, list[bool]], pos: tuple[int, int]) -> None:
+        gapInd = self._gapIndex(pos)
+        if gapInd >= 0:
+            layer[1][gapInd] = True
+        else:
+            layer[0][pos[0] - 1, pos[1] - 1] = True
+
+    def _layerHas(self, layer: tuple[np.ndarray, list[bool]], pos: tuple[int, int]) -> bool:
+        gapInd = self._gapIndex(pos)
+        if gapInd >= 0:
+            return layer[1][gapInd]
+        return bool(layer[0][pos[0] - 1, pos[1] - 1])
+
+    def _stepLayer(self, layer: tuple[np.ndarray, list[bool]], occupied: np.ndarray) -> tuple[np.ndarray, list[bool]]:
+        frontier, atGap = layer
+
+        # wait in place or step into any open neighbor
+        spread = frontier.copy()
+        spread[1:, :] |= frontier[:-1, :]
+        spread[:-1, :] |= frontier[1:, :]
+        spread[:, 1:] |= frontier[:, :-1]
+        spread[:, :-1] |= frontier[:, 1:]
+
+        # gaps enter the blizzard area through the single cell next to them
+        newAtGap = list(atGap)
+        for gapInd, (gapRow, gapCol) in enumerate((self.sPos, self.ePos)):
+            entryRow = 0 if gapRow == 0 else frontier.shape[0] - 1
+            if atGap[gapInd]:
+                spread[entryRow, gapCol - 1] = True
+            newAtGap[gapInd] = atGap[gapInd] or bool(frontier[entryRow, gapCol - 1])
+
+        return spread & ~occupied, newAtGap
+
+    '''
+        Blizzards of one direction keep their relative positions, so the occupied cells at
+        any time are the initial per-direction maps rolled by the time index.
+    '''
+    def blizzardsAt(self, timeInd: int) -> np.ndarray:
+        occupied = np.zeros(self.blizMaps[(0, 1)].shape, dtype = bool)
+        for (rowDel, colDel), blizMap in self.blizMaps.items():
+            occupied |= np.roll(blizMap, (rowDel * timeInd, colDel * timeInd), axis = (0, 1))
+        return occupied
+
+    def generateDirectionMaps(self, blizzards: dict[tuple[int, int], tuple[int, int]]) -> dict[tuple[int, int], np.ndarray]:
+        # blizzard area excludes the surrounding walls
+        innerShape = (self.mapShape[0] - 2, self.mapShape[1] - 2)
+        blizMaps = {delta: np.zeros(innerShape, dtype = bool) for delta in self.CellElements.BLIZ_TO_DEL.values()}
+        for (rowInd, colInd), deltas in blizzards.items():
+            for delta in deltas:
+                blizMaps[delta][rowInd - 1, colInd - 1] = True
+        return blizMaps
+
+    '''
+        Checks whether a cell is a wall or holds a blizzard at the given time. A blizzard
+        moving right that sits on column c at time t started on column c - t (wrapped), so
+        each direction only needs a single shifted bit test.
+    '''
+    def isBlocked(self, timeInd: int, rowInd: int, colInd: int) -> bool:
+        if (rowInd, colInd) == self.sPos or (rowInd, colInd) == self.ePos:
+            return False
+        numRows, numCols = self.mapShape[0] - 2, self.mapShape[1] - 2
+        rowInd, colInd = rowInd - 1, colInd - 1
+        if not (0 <= rowInd < numRows and 0 <= colInd < numCols):
+            return True
+
+        return bool((self.rightRows[rowInd] >> ((colInd - timeInd) % numCols)) & 1 or
+                    (self.leftRows[rowInd] >> ((colInd + timeInd) % numCols)) & 1 or
+                    (self.downCols[colInd] >> ((rowInd - timeInd) % numRows)) & 1 or
+                    (self.upCols[colInd] >> ((rowInd + timeInd) % numRows)) & 1)
+
+    def generateOccupancyMasks(self, blizzards: dict[tuple[int, int], tuple[int, int]]) -> None:
+        numRows, numCols = self.mapShape[0] - 2, self.mapShape[1] - 2
+        self.rightRows, self.leftRows = [0] * numRows, [0] * numRows
+        self.downCols, self.upCols = [0] * numCols, [0] * numCols
+        for (rowInd, colInd), deltas in blizzards.items():
+            for delta in deltas:
+                match delta:
+                    case (0, 1):
+                        self.rightRows[rowInd - 1] |= 1 << (colInd - 1)
+                    case (0, -1):
+                        self.leftRows[rowInd - 1] |= 1 << (colInd - 1)
+                    case (1, 0):
+                        self.downCols[colInd - 1] |= 1 << (rowInd - 1)
+                    case (-1, 0):
+                        self.upCols[colInd - 1] |= 1 << (rowInd - 1)
+
     '''
         Since we know the blizzards are periodic w.r.t. the size of the columns and rows
         of the entire maze, a 3d-maze composed in time exists of depth LCM(col_space, row_space)
@@ -96,10 +258,13 @@ class BlizzardCrossing:
         return emptyMap
 
     ############### HELPER FUNCS ####################
-    @lru_cache
-    def _generatePosMoves(self, curPos: tuple[int, int]):
+    # Cached per (position, period) rather than per instance so the cache neither keeps
+    # mazes alive nor grows past a fixed number of entries.
+    @staticmethod
+    @lru_cache(maxsize = 1 << 16)
+    def _generatePosMoves(curPos: tuple[int, int, int], period: int) -> list[tuple[int, int, int]]:
         deltas = [(1, 0, 1), (1, 1, 0), (1, -1, 0), (1, 0, -1), (1, 0, 0)]
-        return [self.tupAdder(curPos, delVal) for delVal in deltas]
+        return [((curPos[0] + delVal[0])%period, curPos[1] + delVal[1], curPos[2] + delVal[2]) for delVal in deltas]
     
     '''
         Uses a previously visited dictionary to discover the path used in A*
@@ -148,12 +313,16 @@ class BlizzardCrossing:
     
         return facSet
 
-    def _createEmptyMap(self, walls: set[tuple[int, int]]) -> np.ndarray:
+    def _extractMapMetadata(self, walls: set[tuple[int, int]]) -> tuple[tuple[int, int], int]:
         # Extract maze size
         xVals = [x for x, _ in walls]
         yVals = [y for _, y in walls]
         xRange, yRange = max(xVals) + 1, max(yVals) + 1
         timeRange = self._LCM(xRange-2, yRange-2) # Note that there are no vert blizzards on first/last col to preserve this property
+        return (xRange, yRange), timeRange
+
+    def _createEmptyMap(self, walls: set[tuple[int, int]]) -> np.ndarray:
+        (xRange, yRange), timeRange = self._extractMapMetadata(walls)
 
         # Generate empty array with proper sizing
         twoDMap = [[self.CellElements.EMPTY] * yRange for _ in range(xRange)]
@@ -198,18 +367,50 @@ class BlizzardCrossing:
             endCol += 1
         return (minRow, startCol), (maxRow, endCol)
     
+###################################################################
+#   Benchmark
+#
+# Compares the memory and random lookup throughput of the full
+# time cube from generateAllMaps against isBlocked. Run the file
+# with "--bench" to execute it.
+###################################################################
+import sys
+import random
+import time
+
+def benchmarkOccupancy(inFile: str, numLookups: int = 1000000) -> None:
+    curMaze = BlizzardCrossing(inFile)
+    walls, blizzards = curMaze.parseInputBlizzards(inFile)
+
+    buildStart = time.perf_counter()
+    timeCube = curMaze.generateAllMaps(walls, blizzards)
+    buildTime = time.perf_counter() - buildStart
+    maskList = curMaze.rightRows + curMaze.leftRows + curMaze.downCols + curMaze.upCols
+    maskBytes = sum([sys.getsizeof(mask) for mask in maskList])
+
+    queries = [(random.randrange(curMaze.period), random.randrange(curMaze.mapShape[0]), random.randrange(curMaze.mapShape[1])) for _ in range(numLookups)]
+    cubeStart = time.perf_counter()
+    cubeHits = sum([timeCube[query] == BlizzardCrossing.CellElements.WALL for query in queries])
+    cubeTime = time.perf_counter() - cubeStart
+    maskStart = time.perf_counter()
+    maskHits = sum([curMaze.isBlocked(*query) for query in queries])
+    maskTime = time.perf_counter() - maskStart
+
+    if cubeHits != maskHits:
+        raise RuntimeError("Occupancy mismatch between time cube ({}) and masks ({})".format(cubeHits, maskHits))
+    print("Time cube: {:>12,} bytes, built in {:.3f}s, {:,.0f} lookups/s".format(timeCube.nbytes, buildTime, numLookups / cubeTime))
+    print("Bitmasks:  {:>12,} bytes, built on load, {:,.0f} lookups/s".format(maskBytes, numLookups / maskTime))
+
 if __name__ == "__main__":
+    if "--bench" in sys.argv:
+        benchmarkOccupancy("./2022/Day24/input")
+        sys.exit(0)
+
     # prepare env for p1
     inFile = "./2022/Day24/input"
     curMaze = BlizzardCrossing(inFile)
 
-    # exec algo for p1 
-    sol1 = curMaze.getMinTimeToGoal()
-    print("The solution to part 1 is {}".format(sol1))
-
-    # Given the first part, we now calculate the time back and then forward again.
-    # This can be done by getting the total time and using that as the starting point
-    # for our algorithm.
-    sol2P2 = curMaze.getMinTimeToGoal(custStart = (sol1, *curMaze.ePos), custEnd = curMaze.sPos)
-    sol2P3 = curMaze.getMinTimeToGoal(custStart = (sol1+sol2P2, *curMaze.sPos))
-    print("The solution to part 2 is {} = {}+{}+{}".format(sol1+sol2P2+sol2P3, sol1, sol2P2, sol2P3))
\ No newline at end of file
+    # exec algo for p1 and p2 as a single there, back and there again trip
+    legTimes = curMaze.planTrip([curMaze.sPos, curMaze.ePos, curMaze.sPos, curMaze.ePos])
+    print("The solution to part 1 is {}".format(legTimes[0]))
+    print("The solution to part 2 is {} = {}+{}+{}".format(sum(legTimes), *legTimes))
@@ -6,7 +6,16 @@
 #     simple and wrapping backwards is easier since it's pretty much
 #     a summation caried over to larger digits not in the right
 #     digit value range.
+#
+# Observation:
+#     Shifting every digit up by 2 turns a balanced number into a
+#     plain base 5 number, which int() can parse in one call. The
+#     shift only has to be undone by subtracting 22...2 (base 5) of
+#     the same length, so decoding a line is one translate and one
+#     int() instead of a Python loop over its digits.
 ################################################################
+from typing import Iterable, Iterator
+
 class BaseFive:
     def __init__(self, encoding: dict[str, int]):
         self.baseVal = 5 # This is set in stone for now
@@ -15,6 +24,14 @@ class BaseFive:
 
         # grab max-value for looping
         self.maxEncVal = max(list(self.decDict.values()))
+        self.minEncVal = min(list(self.decDict.values()))
+
+        # balanced digits shifted to plain digits; other digits are made invalid for int()
+        shiftMap = {str(digit):"#" for digit in range(10)}
+        shiftMap.update({char:str(val - self.minEncVal) for char, val in self.decDict.items()})
+        self.shiftTable = str.maketrans(shiftMap)
+        self.digitChars = "".join(self.decDict)
+        self.shiftOffsets = [0]
 
     def decodeString(self, inStr: str) -> int:
         curFactor = 1
@@ -41,6 +58,47 @@ class BaseFive:
             
         return "".join([self.encDict[curVal] for curVal in baseNList])
     
+    '''
+        Streams the decoded values of many encoded lines. Blank lines are skipped.
+    '''
+    def decodeMany(self, inStrs: Iterable[str]) -> Iterator[int]:
+        for inStr in inStrs:
+            inStr = inStr.strip()
+            if inStr:
+                # int() would also accept signs, underscores and inner spaces
+                if inStr.strip(self.digitChars):
+                    raise ValueError("Invalid balanced base {} number '{}'".format(self.baseVal, inStr))
+                yield int(inStr.translate(self.shiftTable), self.baseVal) - self._shiftOffset(len(inStr))
+
+    def encodeMany(self, inVals: Iterable[int]) -> Iterator[str]:
+        for inVal in inVals:
+            yield self.encodeBalanced(inVal)
+
+    def sumFile(self, inFile: str) -> int:
+        with open(inFile, 'r') as inNums:
+            return sum(self.decodeMany(inNums))
+
+    '''
+        Encodes straight into the balanced digits, carrying into the next digit whenever
+        the remainder is above the largest digit. Negative values are supported as well.
+    '''
+    def encodeBalanced(self, inVal: int) -> str:
+        encChars = list()
+        while inVal:
+            digitVal = inVal % self.baseVal
+            if digitVal > self.maxEncVal:
+                digitVal -= self.baseVal
+            encChars.append(self.encDict[digitVal])
+            inVal = (inVal - digitVal) // self.baseVal
+
+        return "".join(reversed(encChars)) if encChars else self.encDict[0]
+
+    # value added to an encoded string of the given length by the digit shift
+    def _shiftOffset(self, strLen: int) -> int:
+        while len(self.shiftOffsets) <= strLen:
+            self.shiftOffsets.append(self.shiftOffsets[-1] * self.baseVal - self.minEncVal)
+        return self.shiftOffsets[strLen]
+
     '''
         Helper function that encodes a number into the non-shifted
         encoding. In this case, it would be the normal base N value
@@ -64,16 +122,66 @@ class BaseFive:
             return [0]
 
 
+################################################################
+#   Benchmark
+#
+# Compares line-by-line decodeString against the streaming
+# sumFile on a generated file. Run the file with "--bench", or
+# with "--check" to make sure malformed lines are rejected.
+################################################################
+import sys
+import os
+import random
+import tempfile
+import time
+
+def benchmarkCodec(b5Mod: BaseFive, numLines: int = 2000000) -> None:
+    randVals = [random.randrange(1, 5**20) for _ in range(numLines)]
+    with tempfile.NamedTemporaryFile('w', suffix = ".snafu", delete = False) as outNums:
+        outNums.write("\n".join(b5Mod.encodeMany(randVals)) + "\n")
+        tempPath = outNums.name
+
+    try:
+        lineStart = time.perf_counter()
+        lineSum = 0
+        with open(tempPath, 'r') as inNums:
+            for curLine in inNums:
+                lineSum += b5Mod.decodeString(curLine.rstrip())
+        lineTime = time.perf_counter() - lineStart
+
+        streamStart = time.perf_counter()
+        streamSum = b5Mod.sumFile(tempPath)
+        streamTime = time.perf_counter() - streamStart
+    finally:
+        os.remove(tempPath)
+
+    if not (lineSum == streamSum == sum(randVals)):
+        raise RuntimeError("Decoded sums do not agree")
+    print("decodeString: {:,.0f} lines/s".format(numLines / lineTime))
+    print("sumFile:      {:,.0f} lines/s".format(numLines / streamTime))
+
+# Malformed lines must raise rather than decode to some other number
+def checkCodec(b5Mod: BaseFive) -> None:
+    for badLine in ["+12", "1_2", "1 2", "123", "1a"]:
+        try:
+            list(b5Mod.decodeMany([badLine]))
+        except ValueError:
+            continue
+        raise RuntimeError("'{}' was decoded instead of rejected".format(badLine))
+    print("All malformed lines rejected")
+
 if __name__ == "__main__":
     # Prepare env for p1
     inFile = "./2022/Day25/input"
     encoding = {"=":-2, "-":-1, "0":0, "1":1, "2":2}
     b5Mod = BaseFive(encoding)
 
-    sol1 = 0
-    with open(inFile, 'r') as inNums:
-        curLine = inNums.readline().rstrip()
-        while curLine:
-            sol1 += b5Mod.decodeString(curLine)
-            curLine = inNums.readline().rstrip()
-    print("Solution to part 1 is {}".format(b5Mod.encodeInt(sol1)))
\ No newline at end of file
+    if "--bench" in sys.argv:
+        benchmarkCodec(b5Mod)
+        sys.exit(0)
+    if "--check" in sys.argv:
+        checkCodec(b5Mod)
+        sys.exit(0)
+
+    sol1 = b5Mod.sumFile(inFile)
+    print("Solution to part 1 is {}".format(b5Mod.encodeBalanced(sol1)))